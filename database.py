@@ -1,16 +1,13 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from passlib.context import CryptContext
 import os
 
-DATABASE_URL = "sqlite:///./test.db"  # Update this with your database URL
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")  # Update this with your database URL
 
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 
 # Dependency to get DB session
 def get_db():
@@ -1,9 +1,12 @@
-from fastapi import Depends, HTTPException, status
+import math
+import os
+from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
-from fastapi.security import OAuth2PasswordBearer
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from database import get_db
 from models import User
 from jose import JWTError, jwt
+from utils.rate_limit import rate_limiter, expensive_requests
 
 # Replace with your actual secret key and algorithm
 SECRET_KEY = "your_secret_key"
@@ -11,9 +14,12 @@ ALGORITHM = "HS256"
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="users/token")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+# Take the client address from X-Forwarded-For when running behind a reverse proxy
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "0") == "1"
+
+def get_user_from_token(token: str, db: Session) -> User:
     """
-    Dependency to get the current authenticated user from the JWT token.
+    Resolve a JWT access token to its user, raising 401/404 if it cannot be.
     """
     try:
         # Decode the token
@@ -41,3 +47,65 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         )
 
     return user
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    """
+    Dependency to get the current authenticated user from the JWT token.
+    """
+    return get_user_from_token(token, db)
+
+def _enforce_rate_limit(scope: str, key: str):
+    retry_after = rate_limiter.hit(scope, key)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests. Please try again later.",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+def get_client_address(request: Request) -> str:
+    """
+    Address used to key per-client limits.
+    """
+    forwarded_for = request.headers.get("X-Forwarded-For")
+    if TRUST_FORWARDED_FOR and forwarded_for:
+        return forwarded_for.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+def client_rate_limit(scope: str):
+    """
+    Dependency factory applying the `scope` rate limit per client address.
+    """
+    def dependency(request: Request):
+        _enforce_rate_limit(scope, f"client:{get_client_address(request)}")
+    return dependency
+
+def user_rate_limit(scope: str):
+    """
+    Dependency factory applying the `scope` rate limit per authenticated user.
+    """
+    def dependency(current_user: User = Depends(get_current_user)):
+        _enforce_rate_limit(scope, f"user:{current_user.id}")
+    return dependency
+
+def login_rate_limit(form_data: OAuth2PasswordRequestForm = Depends()):
+    """
+    Dependency applying the auth rate limit per attempted username.
+    """
+    _enforce_rate_limit("auth", f"user:{form_data.username.lower()}")
+
+def expensive_request_slot():
+    """
+    Dependency holding one of the global slots for expensive work for the
+    duration of the request, or rejecting fast with 503 when none frees up.
+    """
+    if not expensive_requests.acquire():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy. Please try again shortly.",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        yield
+    finally:
+        expensive_requests.release()
@@ -6,12 +6,15 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 # Application Imports
-from database import Base, engine
+from database import engine
 from models import User, Quiz, Report  # Import models to ensure tables are created
-from routes import user_routes, quiz_routes, report_routes
+from routes import user_routes, quiz_routes, report_routes, job_routes
+from utils.jobs import job_queue
+from utils.migrations import run_migrations
+from utils.profiling import SQL_PROFILING, SQLProfilingMiddleware, install_query_hooks
 
 # Application Initialization
-Base.metadata.create_all(bind=engine)  # Initialize database tables
+run_migrations(engine)  # Initialize database tables and indexes
 root_path = os.getenv("ROOT_PATH", "/api")  # Default to "/" if ROOT_PATH is not set
 app = FastAPI(
     title="StudyBuddy API",
@@ -23,6 +26,7 @@ app = FastAPI(
 )
 
 User.create_admin()  # Ensure admin user exists
+job_queue.start()  # Start background workers and resume unfinished jobs
 
 # CORS Middleware
 origins = [
@@ -41,10 +45,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# SQL profiling (opt-in with SQL_PROFILING=1)
+if SQL_PROFILING:
+    install_query_hooks(engine)
+    app.add_middleware(SQLProfilingMiddleware)
+
 # Add Routers
 app.include_router(user_routes.router, prefix="/users", tags=["Users"])
 app.include_router(quiz_routes.router, prefix="/quizzes", tags=["Quizzes"])
 app.include_router(report_routes.router, prefix="/reports", tags=["Reports"])
+app.include_router(job_routes.router, prefix="/jobs", tags=["Jobs"])
 
 # Debug or initialization hooks (if any)
 
@@ -1,8 +1,13 @@
 # models/__init__.py
 
+from .question_blob import QuestionBlob
 from .user import User
 from .quiz import Quiz
 from .report import Report
+from .job import Job
+from .leaderboard import LeaderboardEntry
+from .refresh_token import RefreshToken
+from .progress import UserQuizProgress
 
-__all__ = ["User", "Quiz", "Report"]
+__all__ = ["User", "Quiz", "Report", "QuestionBlob", "Job", "LeaderboardEntry", "RefreshToken", "UserQuizProgress"]
 
@@ -0,0 +1,67 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, JSON
+from datetime import datetime
+from sqlalchemy.orm import Session
+from database import Base
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = {"extend_existing": True}
+
+    # Job states
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # Name of the registered handler
+    status = Column(String, default=QUEUED, index=True)
+    progress = Column(Float, default=0.0)  # Fraction of the work done, 0 to 1
+    payload = Column(JSON, default=dict)  # Handler input
+    result = Column(JSON, nullable=True)  # Handler output once succeeded
+    error = Column(String, nullable=True)  # Failure message once failed
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_on = Column(DateTime, default=datetime.utcnow)
+    started_on = Column(DateTime, nullable=True)
+    finished_on = Column(DateTime, nullable=True)
+    worker_id = Column(String, nullable=True)  # Process running the job
+    heartbeat_on = Column(DateTime, nullable=True)  # Last lease renewal by that process
+
+    def to_dict(self) -> dict:
+        """Serialize the job status for API responses."""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "created_on": self.created_on,
+            "started_on": self.started_on,
+            "finished_on": self.finished_on,
+        }
+
+    @classmethod
+    def get_job_by_id(cls, db_session: Session, job_id: int):
+        """Fetch a single job by ID."""
+        return db_session.query(cls).filter(cls.id == job_id).first()
+
+    @classmethod
+    def get_resumable_jobs(cls, db_session: Session, lease_expired_before: datetime):
+        """
+        Fetch jobs that are queued, or running under a lease that was last
+        renewed before `lease_expired_before` (their worker is gone).
+        """
+        return (
+            db_session.query(cls)
+            .filter(
+                (cls.status == cls.QUEUED)
+                | (
+                    (cls.status == cls.RUNNING)
+                    & ((cls.heartbeat_on.is_(None)) | (cls.heartbeat_on < lease_expired_before))
+                )
+            )
+            .order_by(cls.id)
+            .all()
+        )
@@ -0,0 +1,82 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float, Index, UniqueConstraint
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import relationship, joinedload, Session
+from database import Base
+
+
+class LeaderboardEntry(Base):
+    """
+    A user's best completed attempt at a quiz. Kept up to date as reports are
+    completed, so reading the top K is an index range scan instead of a sort
+    over every report.
+    """
+    __tablename__ = "leaderboard_entries"
+    __table_args__ = (
+        UniqueConstraint("quiz_id", "user_id", name="uq_leaderboard_entries_quiz_user"),
+        {"extend_existing": True},
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    best_score = Column(Float, nullable=False)
+    best_duration = Column(Float, nullable=False)  # Seconds taken on the best attempt
+    achieved_on = Column(DateTime, nullable=False)
+
+    # Relationships
+    user = relationship("User")
+
+    def is_beaten_by(self, score: float, duration: float) -> bool:
+        """A higher score wins; equal scores go to the faster attempt."""
+        return score > self.best_score or (score == self.best_score and duration < self.best_duration)
+
+    @classmethod
+    def record(cls, db: Session, quiz_id: int, user_id: int, score: float, duration: float, achieved_on):
+        """
+        Record a completed attempt, keeping it only if it is the user's best.
+        Changes are left for the caller to commit.
+        """
+        entry = db.query(cls).filter(cls.quiz_id == quiz_id, cls.user_id == user_id).first()
+        if entry is None:
+            # A concurrent completion may insert the row first; if so, compare against it
+            inserted = db.execute(
+                insert(cls)
+                .values(
+                    quiz_id=quiz_id,
+                    user_id=user_id,
+                    best_score=score,
+                    best_duration=duration,
+                    achieved_on=achieved_on,
+                )
+                .on_conflict_do_nothing(index_elements=["quiz_id", "user_id"])
+            ).rowcount
+            if inserted:
+                return
+            entry = db.query(cls).filter(cls.quiz_id == quiz_id, cls.user_id == user_id).one()
+        if entry.is_beaten_by(score, duration):
+            entry.best_score = score
+            entry.best_duration = duration
+            entry.achieved_on = achieved_on
+
+    @classmethod
+    def get_top_entries(cls, db: Session, quiz_id: int, limit: int) -> list:
+        """
+        Fetch the best `limit` entries for a quiz, highest score then fastest first.
+        """
+        return (
+            db.query(cls)
+            .options(joinedload(cls.user))
+            .filter(cls.quiz_id == quiz_id)
+            .order_by(cls.best_score.desc(), cls.best_duration.asc())
+            .limit(limit)
+            .all()
+        )
+
+
+# Serves get_top_entries in index order, without sorting
+Index(
+    "ix_leaderboard_entries_quiz_rank",
+    LeaderboardEntry.quiz_id,
+    LeaderboardEntry.best_score.desc(),
+    LeaderboardEntry.best_duration,
+)
@@ -0,0 +1,72 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float, UniqueConstraint
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from database import Base
+from models.quiz import Quiz
+
+# Weight of the newest score in the mastery average; older attempts fade out
+MASTERY_WEIGHT = 0.5
+
+
+class UserQuizProgress(Base):
+    """
+    Per-(user, quiz) summary of attempts, kept current as reports are started
+    and completed so progress reads never aggregate over reports.
+    """
+    __tablename__ = "user_quiz_progress"
+    __table_args__ = (
+        UniqueConstraint("user_id", "quiz_id", name="uq_user_quiz_progress_user_quiz"),
+        {"extend_existing": True},
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id"), nullable=False)
+    attempts = Column(Integer, default=0)  # Sessions started
+    completions = Column(Integer, default=0)  # Sessions completed
+    best_score = Column(Float, nullable=True)
+    last_score = Column(Float, nullable=True)
+    last_completed_on = Column(DateTime, nullable=True)
+    mastery = Column(Float, nullable=True)  # Recency-weighted average score, 0 to 100
+
+    @classmethod
+    def _get_or_add(cls, db: Session, user_id: int, quiz_id: int) -> "UserQuizProgress":
+        progress = db.query(cls).filter(cls.user_id == user_id, cls.quiz_id == quiz_id).first()
+        if progress is None:
+            # A concurrent session start may insert the row first
+            db.execute(
+                insert(cls)
+                .values(user_id=user_id, quiz_id=quiz_id, attempts=0, completions=0)
+                .on_conflict_do_nothing(index_elements=["user_id", "quiz_id"])
+            )
+            progress = db.query(cls).filter(cls.user_id == user_id, cls.quiz_id == quiz_id).one()
+        return progress
+
+    @classmethod
+    def record_attempt(cls, db: Session, user_id: int, quiz_id: int):
+        """Count a started session. Changes are left for the caller to commit."""
+        cls._get_or_add(db, user_id, quiz_id).attempts += 1
+
+    @classmethod
+    def record_completion(cls, db: Session, user_id: int, quiz_id: int, score: float, completed_on):
+        """Fold a completed session into the summary. Changes are left for the caller to commit."""
+        progress = cls._get_or_add(db, user_id, quiz_id)
+        progress.completions += 1
+        progress.best_score = score if progress.best_score is None else max(progress.best_score, score)
+        progress.last_score = score
+        progress.last_completed_on = completed_on
+        if progress.mastery is None:
+            progress.mastery = score
+        else:
+            progress.mastery = MASTERY_WEIGHT * score + (1 - MASTERY_WEIGHT) * progress.mastery
+
+    @classmethod
+    def get_progress_by_user(cls, db: Session, user_id: int) -> list:
+        """Fetch every quiz summary for a user as (summary, quiz name) pairs."""
+        return (
+            db.query(cls, Quiz.name)
+            .join(Quiz, Quiz.id == cls.quiz_id)
+            .filter(cls.user_id == user_id)
+            .order_by(cls.last_completed_on.desc())
+            .all()
+        )
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary
+from sqlalchemy.dialects.sqlite import insert
+from datetime import datetime
+from sqlalchemy.orm import Session
+from database import Base
+
+# Number of decompressed question sets kept in memory, keyed by content hash
+QUESTION_CACHE_SIZE = int(os.getenv("QUESTION_CACHE_SIZE", 128))
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class QuestionBlob(Base):
+    __tablename__ = "question_blobs"
+    __table_args__ = {"extend_existing": True}
+
+    hash = Column(String(64), primary_key=True)  # SHA-256 of the uncompressed JSON
+    data = Column(LargeBinary, nullable=False)  # zlib-compressed JSON
+    size = Column(Integer, nullable=False)  # Uncompressed size in bytes
+    created_on = Column(DateTime, default=datetime.utcnow)
+
+    @staticmethod
+    def encode(questions_dict: dict) -> tuple:
+        """Serialize questions and return their (hash, JSON bytes)."""
+        payload = json.dumps(questions_dict).encode("utf-8")
+        return hashlib.sha256(payload).hexdigest(), payload
+
+    @classmethod
+    def get_or_create(cls, db_session: Session, questions_dict: dict) -> "QuestionBlob":
+        """
+        Fetch the blob holding these questions, storing it if it is new.
+        Identical question sets share a single row.
+        """
+        digest, payload = cls.encode(questions_dict)
+        blob = db_session.get(cls, digest)
+        if blob is None:
+            # A concurrent upload of the same content may insert it first
+            db_session.execute(
+                insert(cls)
+                .values(hash=digest, data=zlib.compress(payload), size=len(payload), created_on=datetime.utcnow())
+                .on_conflict_do_nothing(index_elements=["hash"])
+            )
+            blob = db_session.get(cls, digest)
+        return blob
+
+    def decode(self) -> dict:
+        """Decompress and deserialize the stored questions."""
+        return json.loads(zlib.decompress(self.data))
+
+    @classmethod
+    def _load_cached(cls, digest: str, get_blob) -> tuple:
+        """
+        Return (questions, question keys) for `digest`, decompressing them via
+        `get_blob()` only on a cache miss.
+        """
+        with _cache_lock:
+            entry = _cache.get(digest)
+            if entry is not None:
+                _cache.move_to_end(digest)
+                return entry
+
+        questions = get_blob().decode()
+        entry = (questions, tuple(questions.keys()))
+
+        with _cache_lock:
+            _cache[digest] = entry
+            if len(_cache) > QUESTION_CACHE_SIZE:
+                _cache.popitem(last=False)
+        return entry
+
+    @classmethod
+    def load_questions(cls, digest: str, get_blob) -> dict:
+        """
+        Return the questions for `digest`. The returned dict is shared with the
+        cache, so treat it as read-only.
+        """
+        return cls._load_cached(digest, get_blob)[0]
+
+    @classmethod
+    def load_question_keys(cls, digest: str, get_blob) -> tuple:
+        """Return the questions for `digest` in stored order, for indexed access."""
+        return cls._load_cached(digest, get_blob)[1]
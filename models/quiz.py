@@ -1,9 +1,16 @@
 import json
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float
+import os
+from fastapi import HTTPException, status
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, func
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 from sqlalchemy.orm import relationship, Session
 from database import Base
+from models.question_blob import QuestionBlob
+from utils.search import index_quiz
 
+# Define the maximum number of quizzes a user can upload
+MAX_QUIZZES_PER_USER = int(os.getenv("MAX_QUIZZES_PER_USER", 10))  # Default is 10
 
 class Quiz(Base):
     __tablename__ = "quizzes"
@@ -11,9 +18,10 @@ class Quiz(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True, nullable=False)  # Quiz name
-    questions = Column(String, nullable=False)  # Store questions as JSON
+    questions = Column(String, nullable=False, default="")  # Legacy inline JSON, empty once stored in question_blobs
+    questions_hash = Column(String(64), ForeignKey("question_blobs.hash"), nullable=True, index=True)  # Content hash of the questions
     created_on = Column(DateTime, default=datetime.utcnow)  # When the quiz was created
-    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)  # Link to User
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)  # Link to User
     total_questions = Column(Integer, default=0)  # Number of questions in the quiz
 
     # Statistics
@@ -24,18 +32,29 @@ class Quiz(Base):
 
     # Relationships
     creator = relationship("User", back_populates="quizzes")
+    blob = relationship("QuestionBlob")
     reports = relationship("Report", back_populates="quiz", cascade="all, delete-orphan")
 
     # Helper methods for questions
-    def set_questions(self, questions_dict: dict):
-        """Serialize questions into JSON format."""
-        self.questions = json.dumps(questions_dict)
-        self.total_questions = len(questions_dict) 
+    def set_questions(self, db_session: Session, questions_dict: dict):
+        """Store questions in a shared, compressed blob keyed by their content hash."""
+        self.blob = QuestionBlob.get_or_create(db_session, questions_dict)
+        self.questions_hash = self.blob.hash
+        self.questions = ""
+        self.total_questions = len(questions_dict)
 
     def get_questions(self) -> dict:
-        """Deserialize questions from JSON format."""
+        """Deserialize questions, served from the blob cache when possible."""
+        if self.questions_hash:
+            return QuestionBlob.load_questions(self.questions_hash, lambda: self.blob)
         return json.loads(self.questions)
 
+    def get_question_keys(self) -> tuple:
+        """Questions in stored order, served from the blob cache when possible."""
+        if self.questions_hash:
+            return QuestionBlob.load_question_keys(self.questions_hash, lambda: self.blob)
+        return tuple(json.loads(self.questions).keys())
+
     def increment_access_count(self):
         """Increment the times_accessed field."""
         self.times_accessed += 1
@@ -51,6 +70,53 @@ class Quiz(Base):
             total_score = (self.average_score * (self.times_completed - 1)) + new_score
             self.average_score = total_score / self.times_completed
 
+    @classmethod
+    def check_upload_allowed(cls, db_session: Session, name: str, user_id: int, pending: int = 0):
+        """
+        Raise if the name is taken or the user would go over MAX_QUIZZES_PER_USER.
+        `pending` counts quizzes of the user already flushed but not committed.
+        """
+        if user_id is not None:
+            user_quiz_count = db_session.query(func.count(cls.id)).filter(cls.created_by == user_id).scalar()
+            if user_quiz_count - pending >= MAX_QUIZZES_PER_USER:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail=f"You have reached the limit of {MAX_QUIZZES_PER_USER} quizzes.",
+                )
+        if not pending and cls.get_quiz_by_name(db_session, name):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Quiz name already exists. Please choose another name.",
+            )
+
+    @classmethod
+    def create_quiz(cls, db_session: Session, name: str, questions_dict: dict, user_id: int):
+        """
+        Create and save a new quiz from a question-to-answer mapping.
+        The name and quiz limit are checked again after the insert is flushed,
+        which holds SQLite's write lock, so concurrent uploads cannot both pass.
+        """
+        quiz = cls(name=name, created_by=user_id)
+        quiz.set_questions(db_session, questions_dict)
+        db_session.add(quiz)
+        try:
+            db_session.flush()
+        except IntegrityError:
+            db_session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Quiz name already exists. Please choose another name.",
+            )
+        try:
+            cls.check_upload_allowed(db_session, name, user_id, pending=1)
+        except HTTPException:
+            db_session.rollback()
+            raise
+        index_quiz(db_session, quiz.id, name, quiz.questions_hash, questions_dict)
+        db_session.commit()
+        db_session.refresh(quiz)
+        return quiz
+
     @classmethod
     def get_quiz_by_id(cls, db_session: Session, quiz_id: int):
         """Fetch a single quiz by ID."""
@@ -0,0 +1,110 @@
+import hashlib
+import secrets
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, update
+from datetime import datetime, timedelta
+from sqlalchemy.orm import relationship, Session
+from database import Base
+from utils.utils import REFRESH_TOKEN_EXPIRE_DAYS
+
+
+class RefreshToken(Base):
+    """
+    A long-lived token exchanged for new access tokens without a password check.
+    Only a SHA-256 of the token is stored. Each refresh rotates the token within
+    its family; presenting a rotated token again revokes the whole family.
+    """
+    __tablename__ = "refresh_tokens"
+    __table_args__ = {"extend_existing": True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    family_id = Column(String(32), nullable=False, index=True)  # Shared by every rotation of one login
+    issued_on = Column(DateTime, default=datetime.utcnow)
+    expires_on = Column(DateTime, nullable=False)
+    revoked_on = Column(DateTime, nullable=True)
+
+    # Relationships
+    user = relationship("User")
+
+    @staticmethod
+    def hash_token(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def issue(cls, db_session: Session, user_id: int, family_id: str = None) -> str:
+        """
+        Create a refresh token for a user and return the plaintext token.
+        Starts a new family unless `family_id` is given. The user's dead tokens
+        are purged in the same transaction, so rows do not pile up per refresh.
+        """
+        token = secrets.token_urlsafe(32)
+        db_session.add(cls(
+            token_hash=cls.hash_token(token),
+            user_id=user_id,
+            family_id=family_id or secrets.token_hex(16),
+            expires_on=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        ))
+        db_session.flush()  # The new token keeps its family alive through the purge
+        cls.purge(db_session, user_id)
+        db_session.commit()
+        return token
+
+    @classmethod
+    def get_by_token(cls, db_session: Session, token: str):
+        """Fetch the stored row for a plaintext token."""
+        return db_session.query(cls).filter(cls.token_hash == cls.hash_token(token)).first()
+
+    @classmethod
+    def rotate(cls, db_session: Session, token: str) -> tuple:
+        """
+        Exchange a refresh token for a new one in the same family.
+        Returns (user, new_token), or (None, None) if the token is unknown,
+        expired or revoked. Reuse of a revoked token revokes its whole family.
+        """
+        current = cls.get_by_token(db_session, token)
+        if not current or current.expires_on <= datetime.utcnow():
+            return None, None
+
+        # Claim the token with a conditional update so that of two concurrent
+        # refreshes only one wins; the loser is treated as reuse
+        claimed = db_session.execute(
+            update(cls)
+            .where(cls.id == current.id, cls.revoked_on.is_(None))
+            .values(revoked_on=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not claimed:
+            cls.revoke_family(db_session, current.family_id)
+            return None, None
+
+        new_token = cls.issue(db_session, current.user_id, current.family_id)
+        return current.user, new_token
+
+    @classmethod
+    def revoke_family(cls, db_session: Session, family_id: str):
+        """Revoke every token issued from the same login."""
+        db_session.query(cls).filter(cls.family_id == family_id, cls.revoked_on.is_(None)).update(
+            {"revoked_on": datetime.utcnow()}
+        )
+        db_session.commit()
+
+    @classmethod
+    def purge(cls, db_session: Session, user_id: int = None):
+        """
+        Delete tokens that can no longer be used or detected as reuse: expired
+        ones, and every token of a family with no live token left. Limited to
+        one user's tokens when `user_id` is given. Changes are left for the
+        caller to commit.
+        """
+        now = datetime.utcnow()
+        live_families = (
+            db_session.query(cls.family_id)
+            .filter(cls.revoked_on.is_(None), cls.expires_on > now)
+        )
+        query = db_session.query(cls).filter(
+            (cls.expires_on <= now) | cls.family_id.notin_(live_families.scalar_subquery())
+        )
+        if user_id is not None:
+            query = query.filter(cls.user_id == user_id)
+        query.delete(synchronize_session=False)
@@ -1,15 +1,24 @@
 import random
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, JSON, Index
 from sqlalchemy.ext.mutable import MutableList
 from datetime import datetime
 from sqlalchemy.orm import relationship, Session
 from database import Base
 from models.quiz import Quiz
+from models.leaderboard import LeaderboardEntry
+from models.progress import UserQuizProgress
+from utils.archive import read_record
 from fastapi import HTTPException
 
 class Report(Base):
     __tablename__ = "reports"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # Cover the per-user and per-quiz lookups (and their counts) without a table scan
+        Index("ix_reports_user_id_started_on", "user_id", "started_on"),
+        Index("ix_reports_quiz_id_completed_on", "quiz_id", "completed_on"),
+        Index("ix_reports_archived_on_completed_on", "archived_on", "completed_on"),
+        {"extend_existing": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -19,23 +28,38 @@ class Report(Base):
     score = Column(Float, nullable=True)
     total_correct = Column(Integer, default=0)
     total_incorrect = Column(Integer, default=0)
-    incorrect_answers = Column(JSON, default=list)
+    incorrect_answers = Column(MutableList.as_mutable(JSON), default=list)
     asked_questions = Column(MutableList.as_mutable(JSON), default=list)
 
+    # Archiving: answer details of old reports move to an archive segment
+    archived_on = Column(DateTime, nullable=True)
+    archive_segment = Column(String, nullable=True)
+    archive_offset = Column(Integer, nullable=True)
+
+    # Sampled practice sessions ask a random subset of the quiz
+    sample_size = Column(Integer, nullable=True)  # Questions in the subset, None for the whole quiz
+    sample_seed = Column(Integer, nullable=True)  # Seed the subset was drawn with
+    question_pool = Column(JSON, nullable=True)  # The sampled questions
+
     # Relationships
     user = relationship("User", back_populates="reports")
     quiz = relationship("Quiz", back_populates="reports")
 
     @staticmethod
-    def create_report(db: Session, user_id: int, quiz_id: int) -> "Report":
+    def create_report(
+        db: Session, user_id: int, quiz_id: int, sample_size: int = None, seed: int = None
+    ) -> "Report":
         """
         Create a new report for a quiz session.
+        With `sample_size`, the session covers a uniform random subset of the
+        questions, drawn reproducibly from `seed` (a fresh seed if omitted).
         """
         quiz = Quiz.get_quiz_by_id(db, quiz_id)
         if not quiz:
             raise HTTPException(status_code=404, detail="Quiz not found")
 
         quiz.increment_access_count()
+        UserQuizProgress.record_attempt(db, user_id, quiz_id)
 
         report = Report(
             user_id=user_id,
@@ -43,6 +67,15 @@ class Report(Base):
             started_on=datetime.utcnow(),
             asked_questions=[],
         )
+        if sample_size is not None and sample_size < quiz.total_questions:
+            if seed is None:
+                seed = random.SystemRandom().randrange(2**31)
+            # Draw positions rather than shuffling the question list itself
+            questions = quiz.get_question_keys()
+            positions = random.Random(seed).sample(range(len(questions)), sample_size)
+            report.sample_size = sample_size
+            report.sample_seed = seed
+            report.question_pool = [questions[position] for position in positions]
         db.add(report)
         db.commit()
         db.refresh(report)
@@ -66,8 +99,24 @@ class Report(Base):
             quiz.increment_completion_count()
             quiz.update_statistics(score)
 
+        # Keep the quiz leaderboard and the user's progress summary current.
+        # Sampled sessions cover only part of the quiz, so they are not ranked.
+        if self.sample_size is None:
+            LeaderboardEntry.record(
+                db, self.quiz_id, self.user_id, score, self.duration_seconds(), self.completed_on
+            )
+        UserQuizProgress.record_completion(db, self.user_id, self.quiz_id, score, self.completed_on)
+
         db.commit()
 
+    def duration_seconds(self) -> float:
+        """
+        Time taken to complete the quiz, in seconds.
+        """
+        if not self.started_on or not self.completed_on:
+            return 0.0
+        return (self.completed_on - self.started_on).total_seconds()
+
     def log_answer(self, question: str, user_answer, correct_answer) -> str:
         """
         Log an answer as correct or incorrect and update totals.
@@ -96,6 +145,60 @@ class Report(Base):
             self.asked_questions.append(question)
             db.commit()
 
+    def get_incorrect_answers(self, include_archived: bool = False) -> list:
+        """
+        Incorrect answers for the report. For archived reports these are only
+        read back from the archive segment when `include_archived` is set.
+        """
+        if self.archived_on:
+            if not include_archived:
+                return []
+            return read_record(self.archive_segment, self.archive_offset)["incorrect_answers"] or []
+        return self.incorrect_answers or []
+
+    def get_total_questions(self, quiz: Quiz) -> int:
+        """
+        Number of questions in this session: the sample size, or the whole quiz.
+        """
+        return self.sample_size or quiz.total_questions
+
+    def includes_question(self, question: str) -> bool:
+        """
+        Whether a question belongs to this session's sample (always true for full sessions).
+        """
+        return self.question_pool is None or question in self.question_pool
+
+    def answered_questions(self) -> set:
+        """
+        Questions already answered. asked_questions keeps them first, in the
+        order they were answered, followed by the ones still awaiting an answer.
+        """
+        return set((self.asked_questions or [])[:self.total_correct + self.total_incorrect])
+
+    def unanswered_questions(self) -> list:
+        """
+        Questions asked but not answered yet, in the order they were asked.
+        """
+        answered = self.answered_questions()
+        return [q for q in self.asked_questions or [] if q not in answered]
+
+    def mark_answered(self, question: str):
+        """
+        Move a just-logged answer's question to the end of the answered ones in
+        asked_questions, adding it if it was never asked.
+        """
+        if question in self.asked_questions:
+            self.asked_questions.remove(question)
+        self.asked_questions.insert(self.total_correct + self.total_incorrect - 1, question)
+
+    def remaining_questions(self, all_questions: dict) -> list:
+        """
+        List the session's questions that have not been asked yet.
+        """
+        asked = set(self.asked_questions or [])
+        questions = self.question_pool if self.question_pool is not None else all_questions.keys()
+        return [q for q in questions if q not in asked]
+
     @classmethod
     def get_reports_by_user(cls, db: Session, user_id: int) -> list:
         """
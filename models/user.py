@@ -5,16 +5,13 @@ from sqlalchemy import Column, Integer, String, DateTime
 from datetime import datetime
 from sqlalchemy.orm import relationship, Session
 from database import Base, SessionLocal
-from passlib.context import CryptContext
-from utils.utils import verify_password
+from utils.utils import hash_password, verify_password
+from utils.passwords import verify_and_update
 from sqlalchemy.sql import func
 from models.quiz import Quiz
 from models.report import Report
 
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 class User(Base):
     __tablename__ = "users"
 
@@ -35,10 +32,26 @@ class User(Base):
 
     def verify_password(self, plain_password: str, hashed_password: str):
         """Verify the provided password against the stored hashed password."""
-        from passlib.context import CryptContext
-        pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
         return verify_password(plain_password, hashed_password)
 
+    @classmethod
+    def authenticate(cls, db_session, username: str, password: str):
+        """
+        Return the user if the password matches, otherwise None.
+        Stored hashes with outdated parameters are replaced on a successful login.
+        """
+        user = cls.get_user_by_username(db_session, username)
+        if not user:
+            return None
+
+        verified, new_hash = verify_and_update(password, user.password)
+        if not verified:
+            return None
+        if new_hash:
+            user.password = new_hash
+            db_session.commit()
+        return user
+
     @classmethod
     def create_user(cls, db_session, username: str, hashed_password: str):
         """Create and save a new user."""
@@ -86,6 +99,25 @@ class User(Base):
             print(f"Error serializing user {self.id}: {e}")
             raise
 
+    @classmethod
+    def get_all_users_as_dicts(cls, db: Session) -> list:
+        """
+        Serialize every user like to_dict, counting quizzes and reports for all
+        users in two grouped queries instead of two queries per user.
+        """
+        quiz_counts = dict(db.query(Quiz.created_by, func.count(Quiz.id)).group_by(Quiz.created_by))
+        report_counts = dict(db.query(Report.user_id, func.count(Report.id)).group_by(Report.user_id))
+        return [
+            {
+                "id": user.id,
+                "username": user.username,
+                "created_on": user.created_on,
+                "total_quizzes_created": quiz_counts.get(user.id, 0),
+                "total_reports_created": report_counts.get(user.id, 0),
+            }
+            for user in db.query(cls).all()
+        ]
+
     def create_admin():
         """
         Create a default admin user if it doesn't already exist.
@@ -104,7 +136,7 @@ class User(Base):
                     return
 
                 # Create admin user
-                hashed_password = pwd_context.hash(admin_password)
+                hashed_password = hash_password(admin_password)
                 admin_user = User(username=admin_username, password=hashed_password, is_admin=1)
                 db.add(admin_user)
                 db.commit()
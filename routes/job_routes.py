@@ -0,0 +1,45 @@
+import os
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from database import get_db
+from models import User, Job
+from dependencies import get_current_user
+from utils.jobs import job_file_path
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", status_code=status.HTTP_200_OK)
+def get_job_status(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Get the status, progress and result of a background job.
+    """
+    job = Job.get_job_by_id(db, job_id)
+    if not job or (job.created_by != current_user.id and not current_user.is_admin):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job.to_dict()
+
+
+@router.get("/{job_id}/download")
+def download_job_file(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Download the file a finished job wrote, such as a report export.
+    """
+    job = Job.get_job_by_id(db, job_id)
+    if not job or (job.created_by != current_user.id and not current_user.is_admin):
+        raise HTTPException(status_code=404, detail="Job not found")
+    file_name = (job.result or {}).get("file")
+    if not file_name or not os.path.exists(job_file_path(file_name)):
+        raise HTTPException(status_code=404, detail="This job has no file to download")
+
+    return FileResponse(job_file_path(file_name), media_type="application/json", filename=file_name)
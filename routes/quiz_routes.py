@@ -1,17 +1,26 @@
 import os
 import random
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy import func
+import uuid
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File, Form, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from database import get_db
-import pandas as pd
-from models import User, Quiz, Report
-from dependencies import get_current_user
+from database import get_db, SessionLocal
+from models import User, Quiz, Report, LeaderboardEntry
+from schemas import AnswerRequest, BatchAnswerRequest
+from utils.jobs import job_queue, job_file_path
+from utils.search import search_quizzes
+from utils.utils import parse_quiz_csv
+from dependencies import get_current_user, get_user_from_token, client_rate_limit, user_rate_limit, expensive_request_slot
 
 router = APIRouter()
 
-# Define the maximum number of quizzes a user can upload
-MAX_QUIZZES_PER_USER = int(os.getenv("MAX_QUIZZES_PER_USER", 10))  # Default is 10
+# Bytes read at a time when spooling an upload to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Number of answers a WebSocket session buffers before writing them to the database
+WS_CHECKPOINT_INTERVAL = int(os.getenv("WS_CHECKPOINT_INTERVAL", 10))
 
 
 @router.get("/", status_code=status.HTTP_200_OK)
@@ -31,7 +40,50 @@ def list_all_quizzes(db: Session = Depends(get_db)):
     ]
 
 
-@router.post("/upload-csv", status_code=status.HTTP_201_CREATED)
+@router.get("/search", status_code=status.HTTP_200_OK)
+def search(
+    q: str,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    """
+    Search quiz names and question/answer text, best matches first.
+    """
+    total, results = search_quizzes(db, q, limit, offset)
+    return {
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "results": [
+            {
+                "id": row["id"],
+                "name": row["name"],
+                "created_on": row["created_on"],
+                "total_questions": row["total_questions"],
+                "snippet": row["snippet"],
+            }
+            for row in results
+        ],
+    }
+
+
+def _check_quiz_upload(db: Session, current_user: User, name: str, file: UploadFile):
+    """
+    Reject an upload that breaks the quiz limit, reuses a name or is not a CSV.
+    """
+    # Check the name and quiz limit up front; create_quiz checks them again
+    Quiz.check_upload_allowed(db, name, current_user.id)
+
+    if not file.filename.endswith(".csv"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File must be a CSV.")
+
+
+@router.post(
+    "/upload-csv",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(client_rate_limit("upload")), Depends(user_rate_limit("upload")), Depends(expensive_request_slot)],
+)
 async def upload_csv(
     file: UploadFile = File(...),
     name: str = Form(...),
@@ -41,43 +93,16 @@ async def upload_csv(
     """
     Upload a CSV file to create a new quiz with a unique name.
     """
-    # Check if the quiz limit has been reached
-    user_quiz_count = db.query(func.count(Quiz.id)).filter(Quiz.created_by == current_user.id).scalar()
-    if user_quiz_count >= MAX_QUIZZES_PER_USER:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail=f"You have reached the limit of {MAX_QUIZZES_PER_USER} quizzes."
-        )
-    if Quiz.get_quiz_by_name(db, name):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Quiz name already exists. Please choose another name.",
-        )
-
-    if not file.filename.endswith(".csv"):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File must be a CSV.")
+    _check_quiz_upload(db, current_user, name, file)
 
     try:
-        # Read the CSV into a DataFrame
-        df = pd.read_csv(file.file)
-        if "Q" not in df.columns or "A" not in df.columns:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="CSV must contain 'Q' and 'A' columns.",
-            )
+        # Read the CSV and create the quiz
+        questions = parse_quiz_csv(file.file)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-        # Create the quiz
-        questions = dict(zip(df["Q"], df["A"]))
-        quiz = Quiz(
-            name=name,
-            questions=questions,
-            total_questions=len(questions),
-            created_by=current_user.id,
-        )
-        quiz.set_questions(questions)
-        db.add(quiz)
-        db.commit()
-        db.refresh(quiz)
+    try:
+        quiz = Quiz.create_quiz(db, name, questions, current_user.id)
 
         return {
             "message": "Quiz created successfully",
@@ -86,6 +111,8 @@ async def upload_csv(
             "name": name,
             "created_on": quiz.created_on,
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -93,21 +120,74 @@ async def upload_csv(
         )
 
 
+@router.post(
+    "/upload-csv/async",
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(client_rate_limit("upload")), Depends(user_rate_limit("upload"))],
+)
+async def upload_csv_async(
+    file: UploadFile = File(...),
+    name: str = Form(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Upload a CSV file and create the quiz in a background job.
+    Poll /jobs/{job_id} for the outcome.
+    """
+    _check_quiz_upload(db, current_user, name, file)
+
+    # Spool the upload to a file; the job only stores its path
+    csv_path = job_file_path(f"upload-{uuid.uuid4().hex}.csv")
+    with open(csv_path, "wb") as f:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            f.write(chunk)
+
+    job = job_queue.submit(
+        db, "import_quiz_csv", {"name": name, "csv_path": csv_path, "user_id": current_user.id}, current_user.id
+    )
+    return {"job_id": job.id, "status": job.status}
+
+
+@router.post("/{quiz_id}/recompute-statistics", status_code=status.HTTP_202_ACCEPTED)
+def recompute_statistics(
+    quiz_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Rebuild a quiz's statistics from its reports in a background job.
+    Only accessible by the quiz creator and admins.
+    """
+    quiz = Quiz.get_quiz_by_id(db, quiz_id)
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    if quiz.created_by != current_user.id and not current_user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden")
+
+    job = job_queue.submit(db, "recompute_quiz_statistics", {"quiz_id": quiz_id}, current_user.id)
+    return {"job_id": job.id, "status": job.status}
+
+
 @router.post("/start", status_code=status.HTTP_201_CREATED)
 def start_quiz(
     quiz_id: int,
+    sample_size: Optional[int] = Query(None, ge=1),
+    seed: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Start a new quiz session (create a report).
+    Pass sample_size (and optionally seed) to practice a random subset of the quiz.
     """
 
     # Get the report and quiz to start the quiz with a first question
-    report = Report.create_report(db=db, user_id=current_user.id, quiz_id=quiz_id)
+    report = Report.create_report(
+        db=db, user_id=current_user.id, quiz_id=quiz_id, sample_size=sample_size, seed=seed
+    )
     quiz = Quiz.get_quiz_by_id(db, quiz_id)
-    all_questions = [q for q in quiz.get_questions().keys()]
-    next_question = random.choice(all_questions)
+    next_question = random.choice(report.remaining_questions(quiz.get_questions()))
     report.update_asked_questions(next_question, db)
 
     return {
@@ -115,9 +195,11 @@ def start_quiz(
         "total_correct": report.total_correct,
         "total_incorrect": report.total_incorrect,
         "next_question": next_question,
-        "total_questions": quiz.total_questions,
+        "total_questions": report.get_total_questions(quiz),
         "report_id": report.id,
-        "started_on": report.started_on
+        "started_on": report.started_on,
+        "sample_size": report.sample_size,
+        "seed": report.sample_seed,
     }
 
 
@@ -142,20 +224,22 @@ def submit_answer(
 
     all_questions = quiz.get_questions()
     correct_answer = all_questions.get(question)
-    if not correct_answer:
+    if not correct_answer or not report.includes_question(question):
         raise HTTPException(status_code=400, detail="Invalid question submitted")
+    if question in report.answered_questions():
+        raise HTTPException(status_code=400, detail="Question already answered")
 
     # Log the answer
     result = report.log_answer(question, user_answer, correct_answer)
+    report.mark_answered(question)
 
-    # Determine remaining questions
-    remaining_questions = [
-        q for q in all_questions.keys() if q not in report.asked_questions
-    ]
+    # Determine remaining questions, including any asked one still unanswered
+    remaining_questions = report.remaining_questions(all_questions)
+    unanswered = report.unanswered_questions()
 
-    if not remaining_questions:
+    if not remaining_questions and not unanswered:
         # Quiz completed
-        score = (report.total_correct / quiz.total_questions) * 100
+        score = (report.total_correct / report.get_total_questions(quiz)) * 100
         report.mark_completed(db, score)
         return {
             "status": "completed",
@@ -165,9 +249,13 @@ def submit_answer(
             "score": score,
         }
 
-    # Get the next question
-    next_question = random.choice(remaining_questions)
-    report.update_asked_questions(next_question, db)
+    # Serve the pending question again, or get the next one
+    if unanswered:
+        next_question = unanswered[0]
+        db.commit()
+    else:
+        next_question = random.choice(remaining_questions)
+        report.update_asked_questions(next_question, db)
 
     return {
         "status": "in_progress",
@@ -176,10 +264,292 @@ def submit_answer(
         "total_correct": report.total_correct,
         "total_incorrect": report.total_incorrect,
         "next_question": next_question,
-        "total_questions": quiz.total_questions,
+        "total_questions": report.get_total_questions(quiz),
+    }
+
+
+@router.post("/{quiz_id}/submit-answers")
+def submit_answers(
+    quiz_id: int,
+    batch: BatchAnswerRequest,
+    db: Session = Depends(get_db),
+):
+    """
+    Grade an ordered batch of answers for a report in a single transaction.
+    Lets clients that answered offline sync a whole session in one request.
+    """
+    report = Report.get_report_by_id(db, batch.report_id)
+    if not report:
+        raise HTTPException(status_code=404, detail="Report not found")
+    if report.quiz_id != quiz_id:
+        raise HTTPException(status_code=400, detail="Report does not belong to this quiz")
+    if report.completed_on:
+        raise HTTPException(status_code=400, detail="This report has already been completed.")
+
+    quiz = Quiz.get_quiz_by_id(db, quiz_id)
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+
+    all_questions = quiz.get_questions()
+
+    # Validate the whole batch first so a bad item leaves nothing half-graded
+    answered = report.answered_questions()
+    for answer in batch.answers:
+        if answer.question not in all_questions or not report.includes_question(answer.question):
+            raise HTTPException(
+                status_code=400, detail=f"Invalid question submitted: {answer.question}"
+            )
+        if answer.question in answered:
+            raise HTTPException(
+                status_code=400, detail=f"Question already answered: {answer.question}"
+            )
+        answered.add(answer.question)
+
+    # Grade every answer in order
+    results = []
+    for answer in batch.answers:
+        correct_answer = all_questions[answer.question]
+        result = report.log_answer(answer.question, answer.user_answer, correct_answer)
+        report.mark_answered(answer.question)
+        results.append({
+            "question": answer.question,
+            "result": result,
+            "correct_answer": correct_answer if result == "incorrect" else None,
+        })
+
+    remaining_questions = report.remaining_questions(all_questions)
+    unanswered = report.unanswered_questions()
+
+    if not remaining_questions and not unanswered:
+        # Quiz completed, mark_completed commits the whole batch
+        score = (report.total_correct / report.get_total_questions(quiz)) * 100
+        report.mark_completed(db, score)
+        return {
+            "status": "completed",
+            "message": "Quiz completed!",
+            "results": results,
+            "total_correct": report.total_correct,
+            "total_incorrect": report.total_incorrect,
+            "score": score,
+        }
+
+    # Keep a question the batch skipped pending, or queue up a new one,
+    # and commit the batch in one go
+    if unanswered:
+        next_question = unanswered[0]
+    else:
+        next_question = random.choice(remaining_questions)
+        report.asked_questions.append(next_question)
+    db.commit()
+
+    return {
+        "status": "in_progress",
+        "results": results,
+        "total_correct": report.total_correct,
+        "total_incorrect": report.total_incorrect,
+        "next_question": next_question,
+        "total_questions": report.get_total_questions(quiz),
     }
 
 
+def _open_ws_session(
+    db: Session,
+    token: str,
+    quiz_id: int,
+    report_id: Optional[int],
+    sample_size: Optional[int],
+    seed: Optional[int],
+):
+    """
+    Authenticate a WebSocket session and load (or start) its report.
+    Returns the report, quiz, parsed questions, the questions not asked yet and
+    the asked questions still awaiting an answer, raising HTTPException if the
+    session cannot be opened.
+    """
+    current_user = get_user_from_token(token, db)
+
+    quiz = Quiz.get_quiz_by_id(db, quiz_id)
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+
+    # Resume an existing report or start a new one
+    if report_id is not None:
+        report = Report.get_report_by_id(db, report_id)
+        if not report or report.user_id != current_user.id or report.quiz_id != quiz_id:
+            raise HTTPException(status_code=404, detail="Report not found")
+        if report.completed_on:
+            raise HTTPException(status_code=400, detail="This report has already been completed.")
+    else:
+        report = Report.create_report(
+            db=db, user_id=current_user.id, quiz_id=quiz_id, sample_size=sample_size, seed=seed
+        )
+
+    all_questions = quiz.get_questions()
+    remaining_questions = report.remaining_questions(all_questions)
+    answered = report.answered_questions()
+    pending_questions = [q for q in report.asked_questions if q not in answered]
+    if not pending_questions:
+        next_question = random.choice(remaining_questions)
+        remaining_questions.remove(next_question)
+        report.asked_questions.append(next_question)
+        pending_questions.append(next_question)
+        db.commit()
+    return report, quiz, all_questions, remaining_questions, pending_questions
+
+
+@router.websocket("/{quiz_id}/ws")
+async def quiz_session(
+    websocket: WebSocket,
+    quiz_id: int,
+    token: str,
+    report_id: Optional[int] = None,
+    sample_size: Optional[int] = Query(None, ge=1),
+    seed: Optional[int] = None,
+):
+    """
+    Run a whole quiz session over one WebSocket connection.
+    The user, report and parsed questions are loaded once; answers are graded in
+    memory and written to the database every WS_CHECKPOINT_INTERVAL answers,
+    on completion and when the connection ends. Database work runs in the
+    threadpool so it never blocks other connections.
+    New sessions accept sample_size and seed like /quizzes/start.
+
+    Client messages: {"question": ..., "user_answer": ...}
+    Server messages: "session", "answer", "completed" and "error" events.
+    """
+    await websocket.accept()
+    # Keep loaded state across commits; an expired attribute would be reloaded
+    # by a query on the event loop the next time it is read
+    db = SessionLocal(expire_on_commit=False)
+    pending_answers = 0
+    try:
+        try:
+            report, quiz, all_questions, remaining_questions, pending_questions = await run_in_threadpool(
+                _open_ws_session, db, token, quiz_id, report_id, sample_size, seed
+            )
+        except HTTPException as e:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=e.detail)
+            return
+
+        total_questions = report.get_total_questions(quiz)
+        await websocket.send_json({
+            "type": "session",
+            "status": "in_progress",
+            "report_id": report.id,
+            "total_correct": report.total_correct,
+            "total_incorrect": report.total_incorrect,
+            "next_question": pending_questions[0],
+            "total_questions": total_questions,
+        })
+
+        while True:
+            # Reject malformed messages one at a time without ending the session
+            try:
+                answer = AnswerRequest.model_validate_json(await websocket.receive_text())
+            except ValidationError:
+                await websocket.send_json({"type": "error", "detail": "Expected {\"question\": ..., \"user_answer\": ...}"})
+                continue
+
+            question = answer.question
+            correct_answer = all_questions.get(question)
+            if correct_answer is None or not report.includes_question(question):
+                await websocket.send_json({"type": "error", "detail": "Invalid question submitted"})
+                continue
+            if question in pending_questions:
+                pending_questions.remove(question)
+            elif question in remaining_questions:
+                remaining_questions.remove(question)
+            else:
+                await websocket.send_json({"type": "error", "detail": "Question already answered"})
+                continue
+
+            result = report.log_answer(question, answer.user_answer, correct_answer)
+            report.mark_answered(question)
+            pending_answers += 1
+
+            if not pending_questions and not remaining_questions:
+                # Quiz completed, mark_completed commits everything still pending
+                score = (report.total_correct / total_questions) * 100
+                try:
+                    await run_in_threadpool(report.mark_completed, db, score)
+                except HTTPException as e:
+                    await websocket.send_json({"type": "error", "detail": e.detail})
+                    await websocket.close()
+                    return
+                pending_answers = 0
+                await websocket.send_json({
+                    "type": "completed",
+                    "status": "completed",
+                    "message": "Quiz completed!",
+                    "result": result,
+                    "correct_answer": correct_answer if result == "incorrect" else None,
+                    "total_correct": report.total_correct,
+                    "total_incorrect": report.total_incorrect,
+                    "score": score,
+                })
+                await websocket.close()
+                return
+
+            if not pending_questions:
+                # Draw the next question without rescanning the whole quiz
+                index = random.randrange(len(remaining_questions))
+                remaining_questions[index], remaining_questions[-1] = remaining_questions[-1], remaining_questions[index]
+                next_question = remaining_questions.pop()
+                report.asked_questions.append(next_question)
+                pending_questions.append(next_question)
+
+            if pending_answers >= WS_CHECKPOINT_INTERVAL:
+                await run_in_threadpool(db.commit)
+                pending_answers = 0
+
+            await websocket.send_json({
+                "type": "answer",
+                "status": "in_progress",
+                "result": result,
+                "correct_answer": correct_answer if result == "incorrect" else None,
+                "total_correct": report.total_correct,
+                "total_incorrect": report.total_incorrect,
+                "next_question": pending_questions[0],
+                "total_questions": total_questions,
+            })
+    except WebSocketDisconnect:
+        pass
+    finally:
+        try:
+            # Persist whatever was answered since the last checkpoint, however the session ended
+            if pending_answers:
+                await run_in_threadpool(db.commit)
+        finally:
+            await run_in_threadpool(db.close)
+
+
+@router.get("/{quiz_id}/leaderboard", status_code=status.HTTP_200_OK)
+def get_leaderboard(
+    quiz_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """
+    Get the users with the best scores on a quiz, ties broken by fastest completion.
+    """
+    quiz = Quiz.get_quiz_by_id(db, quiz_id)
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+
+    entries = LeaderboardEntry.get_top_entries(db, quiz_id, limit)
+    return [
+        {
+            "rank": rank,
+            "user_id": entry.user_id,
+            "username": entry.user.username,
+            "best_score": entry.best_score,
+            "best_duration_seconds": entry.best_duration,
+            "achieved_on": entry.achieved_on,
+        }
+        for rank, entry in enumerate(entries, start=1)
+    ]
+
+
 @router.get("/{quiz_id}", status_code=status.HTTP_200_OK)
 def get_quiz_details(quiz_id: int, db: Session = Depends(get_db)):
     """
@@ -1,39 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from database import get_db
-from models import Report, Quiz
+from models import Report, Quiz, User
 from schemas import ScoreResponse
 from typing import List
 from dependencies import get_current_user
+from utils.archive import ARCHIVE_AFTER_DAYS
+from utils.jobs import job_queue
 
 router = APIRouter()
 
 @router.get("/by-user", response_model=List[ScoreResponse])
 def get_reports_by_user(
+    include_archived: bool = False,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
     """
     Get all reports for the current user.
+    Set include_archived to read incorrect answers back from archived reports.
     """
     reports = Report.get_reports_by_user(db, user_id=current_user.id)
+    # Look up every quiz name in one query rather than one per report
+    quiz_names = dict(
+        db.query(Quiz.id, Quiz.name).filter(Quiz.id.in_({report.quiz_id for report in reports}))
+    )
     return [
         {
-            "quiz_name": db.query(Quiz).filter(Quiz.id == report.quiz_id).first().name,
-            "started_on": report.started_on,
-            "completed_on": report.completed_on,
+            "quiz_name": quiz_names[report.quiz_id],
+            "started_on": report.started_on.isoformat() if report.started_on else None,
+            "completed_on": report.completed_on.isoformat() if report.completed_on else None,
             "score": report.score,
             "total_correct": report.total_correct,
             "total_incorrect": report.total_incorrect,
-            "incorrect_answers": report.incorrect_answers,
+            "incorrect_answers": report.get_incorrect_answers(include_archived),
+            "sample_size": report.sample_size,
+            "archived": report.archived_on is not None,
         }
         for report in reports
     ]
 
 @router.get("/by-quiz/{quiz_id}", response_model=List[ScoreResponse])
-def get_reports_by_quiz(quiz_id: int, db: Session = Depends(get_db)):
+def get_reports_by_quiz(quiz_id: int, include_archived: bool = False, db: Session = Depends(get_db)):
     """
     Get all reports for a specific quiz.
+    Set include_archived to read incorrect answers back from archived reports.
     """
     # Fetch all reports for the quiz
     reports = Report.get_reports_by_quiz(db, quiz_id=quiz_id)
@@ -54,15 +65,51 @@ def get_reports_by_quiz(quiz_id: int, db: Session = Depends(get_db)):
             "score": report.score,
             "total_correct": report.total_correct,
             "total_incorrect": report.total_incorrect,
-            "incorrect_answers": report.incorrect_answers if report.incorrect_answers else [],
+            "incorrect_answers": report.get_incorrect_answers(include_archived),
+            "sample_size": report.sample_size,
+            "archived": report.archived_on is not None,
         }
         for report in reports
     ]
 
+@router.post("/by-quiz/{quiz_id}/export", status_code=status.HTTP_202_ACCEPTED)
+def export_reports_by_quiz(
+    quiz_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Export all reports for a quiz in a background job.
+    Poll /jobs/{job_id} for the result.
+    """
+    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+
+    job = job_queue.submit(db, "export_quiz_reports", {"quiz_id": quiz_id}, current_user.id)
+    return {"job_id": job.id, "status": job.status}
+
+@router.post("/archive", status_code=status.HTTP_202_ACCEPTED)
+def archive_old_reports(
+    older_than_days: int = ARCHIVE_AFTER_DAYS,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Archive reports completed more than `older_than_days` ago in a background job.
+    Only accessible by admins.
+    """
+    if not current_user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden")
+
+    job = job_queue.submit(db, "archive_reports", {"older_than_days": older_than_days}, current_user.id)
+    return {"job_id": job.id, "status": job.status}
+
 @router.get("/{report_id}", response_model=ScoreResponse)
-def get_report_by_id(report_id: int, db: Session = Depends(get_db)):
+def get_report_by_id(report_id: int, include_archived: bool = False, db: Session = Depends(get_db)):
     """
     Get a specific report by its ID.
+    Set include_archived to read incorrect answers back from an archived report.
     """
     # Fetch the report by ID
     report = Report.get_report_by_id(db, report_id=report_id)
@@ -82,5 +129,7 @@ def get_report_by_id(report_id: int, db: Session = Depends(get_db)):
         "score": report.score,
         "total_correct": report.total_correct,
         "total_incorrect": report.total_incorrect,
-        "incorrect_answers": report.incorrect_answers,  # Assuming it's already JSON serializable
+        "incorrect_answers": report.get_incorrect_answers(include_archived),
+        "sample_size": report.sample_size,
+        "archived": report.archived_on is not None,
     }
@@ -3,16 +3,22 @@ from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordRequestForm
 from database import get_db
 from models.user import User
-from schemas import RegisterRequest
+from models.refresh_token import RefreshToken
+from models.progress import UserQuizProgress
+from schemas import RegisterRequest, RefreshRequest
 from utils.utils import create_access_token, hash_password
-from passlib.context import CryptContext
-from dependencies import get_current_user
+from dependencies import get_current_user, client_rate_limit, login_rate_limit, expensive_request_slot
+from utils.passwords import hashing_stats
+from utils.rate_limit import get_limiter_stats
 
 router = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
-@router.post("/token", status_code=status.HTTP_200_OK)
+@router.post(
+    "/token",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(client_rate_limit("auth")), Depends(login_rate_limit), Depends(expensive_request_slot)],
+)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
@@ -21,19 +27,50 @@ async def login_for_access_token(
     Authenticate user and return a JWT token.
     """
     # Fetch user from the database
-    user = User.get_user_by_username(db, form_data.username)
-    if not user or not user.verify_password(form_data.password, user.password):
+    user = User.authenticate(db, form_data.username, form_data.password)
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password",
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    # Generate JWT token
+    # Generate JWT and refresh tokens
     access_token = create_access_token(data={"sub": user.username})
-    return {"access_token": access_token, "token_type": "bearer"}
+    refresh_token = RefreshToken.issue(db, user.id)
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
-@router.post("/register", status_code=status.HTTP_201_CREATED)
+@router.post("/token/refresh", status_code=status.HTTP_200_OK)
+def refresh_access_token(request: RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Exchange a refresh token for a new access token and a rotated refresh token.
+    """
+    user, refresh_token = RefreshToken.rotate(db, request.refresh_token)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    access_token = create_access_token(data={"sub": user.username})
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+@router.post("/token/revoke", status_code=status.HTTP_200_OK)
+def revoke_refresh_token(request: RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Log out: revoke a refresh token and every token rotated from the same login.
+    """
+    token = RefreshToken.get_by_token(db, request.refresh_token)
+    if token:
+        RefreshToken.revoke_family(db, token.family_id)
+    return {"message": "Refresh token revoked"}
+
+@router.post(
+    "/register",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(client_rate_limit("auth")), Depends(expensive_request_slot)],
+)
 def register_user(user: RegisterRequest, db: Session = Depends(get_db)):
     """
     Register a new user.
@@ -51,24 +88,28 @@ def register_user(user: RegisterRequest, db: Session = Depends(get_db)):
     
     return {"message": "User registered successfully", "user_id": new_user.id}
 
-@router.post("/login")
+@router.post(
+    "/login",
+    dependencies=[Depends(client_rate_limit("auth")), Depends(login_rate_limit), Depends(expensive_request_slot)],
+)
 def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """
     Authenticate a user and return a JWT token.
     """
     # Fetch the user from the database
-    user = User.get_user_by_username(db, form_data.username)
-    if not user or not user.verify_password(form_data.password, user.password):
+    user = User.authenticate(db, form_data.username, form_data.password)
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password",
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    # Create a JWT access token
+    # Create a JWT access token and a refresh token
     access_token = create_access_token(data={"sub": user.username})
+    refresh_token = RefreshToken.issue(db, user.id)
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 @router.get("/profile/{user_id}", status_code=status.HTTP_200_OK)
 def get_user_profile(user_id: int, db: Session = Depends(get_db)):
@@ -94,13 +135,52 @@ def get_all_users(db: Session = Depends(get_db), current_user: User = Depends(ge
     if not current_user.is_admin:  # Assuming `is_admin` is a field in the User model
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden")
 
-    users = db.query(User).all()
-    all_users = [user.to_dict(db) for user in users]
-    return all_users
+    return User.get_all_users_as_dicts(db)
 
 @router.get("/me", status_code=status.HTTP_200_OK)
 def get_current_user_details(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     """
     Retrieve details about the currently authenticated user.
     """
-    return current_user.to_dict(db)
\ No newline at end of file
+    return current_user.to_dict(db)
+
+@router.get("/me/progress", status_code=status.HTTP_200_OK)
+def get_current_user_progress(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    Per-quiz attempts, best and last scores and mastery for the current user.
+    """
+    return [
+        {
+            "quiz_id": progress.quiz_id,
+            "quiz_name": quiz_name,
+            "attempts": progress.attempts,
+            "completions": progress.completions,
+            "best_score": progress.best_score,
+            "last_score": progress.last_score,
+            "last_completed_on": progress.last_completed_on,
+            "mastery": progress.mastery,
+        }
+        for progress, quiz_name in UserQuizProgress.get_progress_by_user(db, current_user.id)
+    ]
+
+@router.get("/limits", status_code=status.HTTP_200_OK)
+def get_limit_stats(current_user: User = Depends(get_current_user)):
+    """
+    Rejection counters for the rate limits and the expensive request cap.
+    Only accessible by admins.
+    """
+    if not current_user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden")
+
+    return get_limiter_stats()
+
+@router.get("/hashing", status_code=status.HTTP_200_OK)
+def get_hashing_stats(current_user: User = Depends(get_current_user)):
+    """
+    Password verification timings, the configured bcrypt cost and rehash count.
+    Only accessible by admins.
+    """
+    if not current_user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden")
+
+    return hashing_stats.to_dict()
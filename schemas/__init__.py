@@ -1,6 +1,6 @@
 # schemas/__init__.py
-from .answer import AnswerRequest, AnswerResponse
+from .answer import AnswerRequest, AnswerResponse, BatchAnswerRequest
 from .report import ReportRequest, ScoreResponse
-from .user import RegisterRequest
+from .user import RegisterRequest, RefreshRequest
 
-__all__ = ["AnswerRequest", "AnswerResponse", "ReportRequest", "ScoreResponse", "RegisterRequest"]
+__all__ = ["AnswerRequest", "AnswerResponse", "BatchAnswerRequest", "ReportRequest", "ScoreResponse", "RegisterRequest", "RefreshRequest"]
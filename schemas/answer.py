@@ -1,5 +1,6 @@
 # schemas/answer.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List
 
 class AnswerRequest(BaseModel):
     question: str
@@ -8,3 +9,7 @@ class AnswerRequest(BaseModel):
 class AnswerResponse(BaseModel):
     result: str
     correct_answer: str = None
+
+class BatchAnswerRequest(BaseModel):
+    report_id: int
+    answers: List[AnswerRequest] = Field(min_length=1)  # In the order they were answered
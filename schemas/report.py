@@ -20,3 +20,5 @@ class ScoreResponse(BaseModel):
     total_correct: int
     total_incorrect: int
     incorrect_answers: List[IncorrectAnswer]
+    sample_size: Optional[int] = None  # Set for sampled practice sessions
+    archived: bool = False  # Incorrect answers of archived reports are only returned with include_archived
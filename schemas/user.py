@@ -4,3 +4,6 @@ from pydantic import BaseModel
 class RegisterRequest(BaseModel):
     username: str
     password: str
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
@@ -0,0 +1,140 @@
+import fcntl
+import json
+import os
+import struct
+import sys
+import zlib
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Where archive segments are written, and when reports move there
+ARCHIVE_DIR = os.getenv("REPORT_ARCHIVE_DIR", "./archive")
+ARCHIVE_AFTER_DAYS = int(os.getenv("REPORT_ARCHIVE_AFTER_DAYS", 90))
+SEGMENT_MAX_BYTES = int(os.getenv("REPORT_ARCHIVE_SEGMENT_MAX_BYTES", 64 * 1024 * 1024))
+
+# Reports moved per transaction
+ARCHIVE_BATCH_SIZE = 500
+
+# Each record is a 4-byte big-endian length followed by zlib-compressed JSON
+_LENGTH = struct.Struct(">I")
+_SEGMENT_PREFIX = "reports-"
+_SEGMENT_SUFFIX = ".seg"
+
+
+def _segment_path(segment: str) -> str:
+    return os.path.join(ARCHIVE_DIR, segment)
+
+
+def _current_segment() -> str:
+    """
+    The segment to append to: the newest one, or a new one once it is full.
+    """
+    segments = sorted(
+        name for name in os.listdir(ARCHIVE_DIR)
+        if name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX)
+    )
+    if segments and os.path.getsize(_segment_path(segments[-1])) < SEGMENT_MAX_BYTES:
+        return segments[-1]
+    number = int(segments[-1][len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)]) + 1 if segments else 1
+    return f"{_SEGMENT_PREFIX}{number:06d}{_SEGMENT_SUFFIX}"
+
+
+def append_records(records: list) -> list:
+    """
+    Append records to the current segment and flush them to disk.
+    Returns a (segment, offset) pointer for each record, in order.
+    """
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    segment = _current_segment()
+    pointers = []
+    with open(_segment_path(segment), "ab") as f:
+        # Segments are append-only; the lock keeps concurrent writers from interleaving
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.seek(0, os.SEEK_END)
+            for record in records:
+                data = zlib.compress(json.dumps(record).encode("utf-8"))
+                pointers.append((segment, f.tell()))
+                f.write(_LENGTH.pack(len(data)) + data)
+            f.flush()
+            os.fsync(f.fileno())
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+    return pointers
+
+
+def read_record(segment: str, offset: int) -> dict:
+    """
+    Read a single record back from a segment.
+    """
+    with open(_segment_path(segment), "rb") as f:
+        f.seek(offset)
+        (length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+        return json.loads(zlib.decompress(f.read(length)))
+
+
+def archive_reports(db: Session, older_than_days: int = ARCHIVE_AFTER_DAYS) -> int:
+    """
+    Move the answer details and sampled question pool of reports completed more
+    than `older_than_days` ago into archive segments, keeping the summary
+    columns in the reports table.
+    Returns the number of reports archived.
+    """
+    from models import Report
+
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    archived = 0
+    while True:
+        batch = (
+            db.query(Report)
+            .filter(
+                Report.completed_on.isnot(None),
+                Report.completed_on < cutoff,
+                Report.archived_on.is_(None),
+            )
+            .order_by(Report.id)
+            .limit(ARCHIVE_BATCH_SIZE)
+            .all()
+        )
+        if not batch:
+            return archived
+
+        # Segments are written before the rows point at them, so a crash in
+        # between only leaves an unreferenced record behind
+        pointers = append_records([
+            {
+                "report_id": report.id,
+                "incorrect_answers": report.incorrect_answers,
+                "asked_questions": report.asked_questions,
+                "question_pool": report.question_pool,
+            }
+            for report in batch
+        ])
+        now = datetime.utcnow()
+        for report, (segment, offset) in zip(batch, pointers):
+            report.archive_segment = segment
+            report.archive_offset = offset
+            report.archived_on = now
+            report.incorrect_answers = None
+            report.asked_questions = None
+            report.question_pool = None
+        db.commit()
+        archived += len(batch)
+
+
+# Run the archiving when the script is executed: python -m utils.archive [days] [--vacuum]
+if __name__ == "__main__":
+    from database import SessionLocal, engine
+
+    args = [arg for arg in sys.argv[1:] if arg != "--vacuum"]
+    days = int(args[0]) if args else ARCHIVE_AFTER_DAYS
+    with SessionLocal() as session:
+        total = archive_reports(session, days)
+    print(f"Archived {total} reports completed more than {days} days ago.")
+
+    if "--vacuum" in sys.argv:
+        # Return the freed pages to the filesystem
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM"))
+        print("Database vacuumed.")
@@ -0,0 +1,118 @@
+import json
+import os
+from fastapi import HTTPException
+from sqlalchemy import func
+from models import Quiz, Report
+from utils.archive import archive_reports
+from utils.jobs import job_handler, job_file_path, JobContext
+from utils.utils import parse_quiz_csv
+
+# Rows between progress updates in long-running exports
+EXPORT_PROGRESS_INTERVAL = 500
+
+
+@job_handler("import_quiz_csv")
+def import_quiz_csv(context: JobContext, payload: dict) -> dict:
+    """
+    Parse an uploaded CSV and create the quiz from it.
+    The spooled upload is removed once the job has run.
+    """
+    db = context.db
+    try:
+        # The name and quiz limit may have changed since the upload was accepted
+        Quiz.check_upload_allowed(db, payload["name"], payload["user_id"])
+
+        try:
+            with open(payload["csv_path"], encoding="utf-8", newline="") as f:
+                questions = parse_quiz_csv(f)
+        except UnicodeDecodeError:
+            raise ValueError("CSV must be UTF-8 encoded.")
+        context.set_progress(0.5)
+
+        quiz = Quiz.create_quiz(db, payload["name"], questions, payload["user_id"])
+    except HTTPException as e:
+        raise ValueError(e.detail)
+    finally:
+        os.remove(payload["csv_path"])
+    return {
+        "id": quiz.id,
+        "name": quiz.name,
+        "total_questions": quiz.total_questions,
+        "created_on": quiz.created_on.isoformat(),
+    }
+
+
+@job_handler("export_quiz_reports")
+def export_quiz_reports(context: JobContext, payload: dict) -> dict:
+    """
+    Serialize every report for a quiz to a JSON file, streamed report by report.
+    The result only points at the file; download it from /jobs/{job_id}/download.
+    """
+    db = context.db
+    quiz = Quiz.get_quiz_by_id(db, payload["quiz_id"])
+    if not quiz:
+        raise ValueError("Quiz not found")
+
+    total = db.query(func.count(Report.id)).filter(Report.quiz_id == quiz.id).scalar()
+    file_name = f"job-{context.job_id}-quiz-{quiz.id}-reports.json"
+    path = job_file_path(file_name)
+    query = db.query(Report).filter(Report.quiz_id == quiz.id).order_by(Report.id)
+    exported = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for index, report in enumerate(query.yield_per(EXPORT_PROGRESS_INTERVAL), start=1):
+            if index > 1:
+                f.write(",")
+            json.dump({
+                "quiz_name": quiz.name,
+                "started_on": report.started_on.isoformat() if report.started_on else None,
+                "completed_on": report.completed_on.isoformat() if report.completed_on else None,
+                "score": report.score,
+                "total_correct": report.total_correct,
+                "total_incorrect": report.total_incorrect,
+                "incorrect_answers": report.get_incorrect_answers(include_archived=True),
+            }, f)
+            exported = index
+            if index % EXPORT_PROGRESS_INTERVAL == 0:
+                context.set_progress(index / total)
+        f.write("]")
+
+    return {"quiz_id": quiz.id, "total_reports": exported, "file": file_name}
+
+
+@job_handler("recompute_quiz_statistics")
+def recompute_quiz_statistics(context: JobContext, payload: dict) -> dict:
+    """
+    Rebuild a quiz's completion statistics from its reports.
+    """
+    db = context.db
+    quiz = Quiz.get_quiz_by_id(db, payload["quiz_id"])
+    if not quiz:
+        raise ValueError("Quiz not found")
+
+    times_completed, highest_score, average_score = (
+        db.query(func.count(Report.id), func.max(Report.score), func.avg(Report.score))
+        .filter(Report.quiz_id == quiz.id, Report.completed_on.isnot(None))
+        .one()
+    )
+    quiz.times_completed = times_completed
+    quiz.highest_score = highest_score or 0.0
+    quiz.average_score = average_score or 0.0
+    quiz.times_accessed = db.query(func.count(Report.id)).filter(Report.quiz_id == quiz.id).scalar()
+    db.commit()
+
+    return {
+        "quiz_id": quiz.id,
+        "times_accessed": quiz.times_accessed,
+        "times_completed": quiz.times_completed,
+        "highest_score": quiz.highest_score,
+        "average_score": quiz.average_score,
+    }
+
+
+@job_handler("archive_reports")
+def archive_old_reports(context: JobContext, payload: dict) -> dict:
+    """
+    Move old completed reports into the archive.
+    """
+    return {"archived": archive_reports(context.db, payload["older_than_days"])}
@@ -0,0 +1,232 @@
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models.job import Job
+
+# Number of worker threads running background jobs
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+# Seconds a running job's lease lasts without a heartbeat before another
+# process may take the job over; leases are renewed every third of this
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 60))
+# Where job inputs and outputs too large for the jobs table are kept
+JOB_FILES_DIR = os.getenv("JOB_FILES_DIR", "./job_files")
+# Hours a finished job's output file is kept for download
+JOB_FILE_RETENTION_HOURS = float(os.getenv("JOB_FILE_RETENTION_HOURS", 7 * 24))
+
+_handlers = {}
+
+
+def job_file_path(name: str) -> str:
+    """
+    Path for a job input or output file. Jobs store only this path, not the
+    contents, so large uploads and exports stay out of the database.
+    Output files are named "job-<id>-..." so the retention sweep finds them.
+    """
+    os.makedirs(JOB_FILES_DIR, exist_ok=True)
+    return os.path.join(JOB_FILES_DIR, name)
+
+
+def remove_expired_job_files(now: float = None) -> int:
+    """
+    Delete job output files written more than JOB_FILE_RETENTION_HOURS ago.
+    Spooled uploads are left alone; their import job removes them.
+    Returns the number of files deleted.
+    """
+    if not os.path.isdir(JOB_FILES_DIR):
+        return 0
+    cutoff = (now or time.time()) - JOB_FILE_RETENTION_HOURS * 3600
+    removed = 0
+    for entry in os.scandir(JOB_FILES_DIR):
+        if entry.name.startswith("job-") and entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue  # Swept by another process
+            removed += 1
+    return removed
+
+
+def job_handler(kind: str):
+    """
+    Register a function as the handler for jobs of `kind`.
+    Handlers are called as handler(context, payload) and return a JSON-serializable result.
+    """
+    def register(func):
+        _handlers[kind] = func
+        return func
+    return register
+
+
+class JobContext:
+    """
+    Passed to handlers: a database session for their work and progress reporting.
+    """
+
+    def __init__(self, job_id: int, db: Session):
+        self.job_id = job_id
+        self.db = db
+
+    def set_progress(self, progress: float):
+        """Record progress in its own transaction so the handler's work stays uncommitted."""
+        with SessionLocal() as db:
+            db.query(Job).filter(Job.id == self.job_id).update({"progress": min(max(progress, 0.0), 1.0)})
+            db.commit()
+
+
+class JobQueue:
+    """
+    Runs persisted jobs on a pool of worker threads. Running jobs hold a lease
+    that this process renews while it is alive; queued jobs and jobs whose
+    lease expired (their process stopped) are picked up on start() and by the
+    heartbeat, so several processes can share one jobs table.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._executor = None
+        self._stop = threading.Event()
+        self._heartbeat = None
+        # Jobs handed to this process's pool and not finished yet
+        self._submitted = set()
+        self._submitted_lock = threading.Lock()
+
+    def start(self):
+        """Start the worker pool and heartbeat, and resume unfinished jobs."""
+        import utils.job_handlers  # noqa: F401  Register the handlers before resuming jobs
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        self._resume_jobs()
+        if self._heartbeat is None:
+            self._stop.clear()
+            self._heartbeat = threading.Thread(target=self._beat, name="job-heartbeat", daemon=True)
+            self._heartbeat.start()
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs; queued jobs stay persisted for the next start()."""
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    def submit(self, db: Session, kind: str, payload: dict, user_id: int = None) -> Job:
+        """
+        Persist a new job and hand it to the worker pool.
+        """
+        if kind not in _handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job = Job(kind=kind, status=Job.QUEUED, payload=payload, created_by=user_id)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        if self._executor is not None:
+            self._hand_to_pool(job.id)
+        return job
+
+    def _hand_to_pool(self, job_id: int):
+        """Submit a job to the pool unless it is already waiting or running here."""
+        with self._submitted_lock:
+            if job_id in self._submitted:
+                return
+            self._submitted.add(job_id)
+        self._executor.submit(self._run, job_id)
+
+    def _resume_jobs(self):
+        """
+        Requeue running jobs whose lease expired and hand every queued job not
+        already in this process's pool to it. The claim in _run makes sure each
+        job still runs only once across processes.
+        """
+        lease_expired_before = datetime.utcnow() - timedelta(seconds=JOB_LEASE_SECONDS)
+        job_ids = []
+        with SessionLocal() as db:
+            for job in Job.get_resumable_jobs(db, lease_expired_before):
+                if job.status == Job.RUNNING:
+                    # Conditional, so a worker renewing its lease right now keeps the job
+                    requeued = (
+                        db.query(Job)
+                        .filter(
+                            Job.id == job.id,
+                            Job.status == Job.RUNNING,
+                            Job.heartbeat_on == job.heartbeat_on,
+                        )
+                        .update({"status": Job.QUEUED, "worker_id": None}, synchronize_session=False)
+                    )
+                    if not requeued:
+                        continue
+                job_ids.append(job.id)
+            db.commit()
+        for job_id in job_ids:
+            self._hand_to_pool(job_id)
+
+    def _beat(self):
+        """
+        Renew the leases of this process's running jobs, take over abandoned
+        ones and delete expired output files.
+        """
+        while not self._stop.wait(JOB_LEASE_SECONDS / 3):
+            try:
+                with SessionLocal() as db:
+                    db.query(Job).filter(Job.status == Job.RUNNING, Job.worker_id == self.worker_id).update(
+                        {"heartbeat_on": datetime.utcnow()}, synchronize_session=False
+                    )
+                    db.commit()
+                self._resume_jobs()
+                remove_expired_job_files()
+            except Exception:
+                print(f"Job heartbeat failed:\n{traceback.format_exc()}")
+
+    def _run(self, job_id: int):
+        try:
+            self._run_claimed(job_id)
+        finally:
+            with self._submitted_lock:
+                self._submitted.discard(job_id)
+
+    def _run_claimed(self, job_id: int):
+        with SessionLocal() as db:
+            # Claim the job so it never runs twice
+            claimed = (
+                db.query(Job)
+                .filter(Job.id == job_id, Job.status == Job.QUEUED)
+                .update({
+                    "status": Job.RUNNING,
+                    "started_on": datetime.utcnow(),
+                    "worker_id": self.worker_id,
+                    "heartbeat_on": datetime.utcnow(),
+                })
+            )
+            db.commit()
+            if not claimed:
+                return
+
+            job = Job.get_job_by_id(db, job_id)
+            try:
+                result = _handlers[job.kind](JobContext(job_id, db), job.payload)
+                db.commit()
+                db.refresh(job)
+                job.status = Job.SUCCEEDED
+                job.progress = 1.0
+                job.result = result
+            except Exception as e:
+                db.rollback()
+                print(f"Job {job_id} ({job.kind}) failed:\n{traceback.format_exc()}")
+                job.status = Job.FAILED
+                job.error = str(e)
+            job.finished_on = datetime.utcnow()
+            db.commit()
+
+
+job_queue = JobQueue(JOB_WORKERS)
@@ -0,0 +1,80 @@
+import json
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from database import Base, engine
+import models  # noqa: F401  Import models so every table is registered on Base.metadata
+from models import Quiz
+from utils.search import create_search_index, index_quiz
+
+
+def add_missing_columns(bind: Engine):
+    """
+    Add columns declared on the models that an existing table is missing.
+    Added columns are nullable, so rows from older releases read back as NULL.
+    """
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=bind.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+
+
+def create_missing_indexes(bind: Engine):
+    """
+    Create indexes declared on the models that an existing database is missing.
+    `create_all` only builds indexes for tables it creates, so tables from older
+    releases never pick up indexes added later.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+
+def move_questions_to_blobs(bind: Engine):
+    """
+    Move inline question JSON from older quizzes into shared question blobs.
+    """
+    with Session(bind=bind) as db:
+        for quiz in db.query(Quiz).filter(Quiz.questions_hash.is_(None)).all():
+            quiz.set_questions(db, json.loads(quiz.questions))
+            db.flush()
+        db.commit()
+
+
+def index_unsearchable_quizzes(bind: Engine):
+    """
+    Add quizzes created before the search index existed to it.
+    """
+    with Session(bind=bind) as db:
+        indexed = {row[0] for row in db.execute(text("SELECT rowid FROM quiz_search"))}
+        for quiz in db.query(Quiz).all():
+            if quiz.id in indexed:
+                continue
+            index_quiz(db, quiz.id, quiz.name, quiz.questions_hash, quiz.get_questions())
+        db.commit()
+
+
+def run_migrations(bind: Engine = engine):
+    """
+    Bring the database schema up to date with the current models.
+    Every step is idempotent, so this is safe to run on each startup.
+    """
+    Base.metadata.create_all(bind=bind)
+    add_missing_columns(bind)
+    create_missing_indexes(bind)
+    move_questions_to_blobs(bind)
+    create_search_index(bind)
+    index_unsearchable_quizzes(bind)
+
+
+# Run the migrations when the script is executed
+if __name__ == "__main__":
+    run_migrations()
+    print(f"Database at {engine.url} is up to date.")
@@ -0,0 +1,102 @@
+import os
+import sys
+import threading
+import time
+from passlib.context import CryptContext
+from passlib.hash import bcrypt
+
+# bcrypt cost factor; run `python -m utils.passwords` to pick one for this machine
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+
+# The single password hashing context. Hashes made with any other cost factor
+# are reported as needing an update, so logins move them to BCRYPT_ROUNDS.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+
+class HashingStats:
+    """Running totals of password verification timings and rehashes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.verifications = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rehashes = 0
+
+    def record_verify(self, seconds: float, rehashed: bool):
+        with self._lock:
+            self.verifications += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            if rehashed:
+                self.rehashes += 1
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            average = self.total_seconds / self.verifications if self.verifications else 0.0
+            return {
+                "bcrypt_rounds": BCRYPT_ROUNDS,
+                "verifications": self.verifications,
+                "average_verify_ms": average * 1000,
+                "max_verify_ms": self.max_seconds * 1000,
+                "rehashes": self.rehashes,
+            }
+
+
+hashing_stats = HashingStats()
+
+
+def hash_password(password: str) -> str:
+    """
+    Hash a plaintext password.
+    """
+    return pwd_context.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a plaintext password against a hashed password.
+    """
+    verified, _ = verify_and_update(plain_password, hashed_password)
+    return verified
+
+
+def verify_and_update(plain_password: str, hashed_password: str) -> tuple:
+    """
+    Verify a password and return (verified, new_hash). new_hash is set when the
+    password is correct but the stored hash uses outdated parameters.
+    """
+    started = time.perf_counter()
+    verified, new_hash = pwd_context.verify_and_update(plain_password, hashed_password)
+    hashing_stats.record_verify(time.perf_counter() - started, new_hash is not None)
+    return verified, new_hash
+
+
+def calibrate_rounds(target_ms: float, min_rounds: int = 4, max_rounds: int = 16) -> int:
+    """
+    Find the highest bcrypt cost whose verify time stays within `target_ms` on this machine.
+    """
+    best = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        hashed = bcrypt.using(rounds=rounds).hash("calibration")
+        started = time.perf_counter()
+        bcrypt.verify("calibration", hashed)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"rounds={rounds}: {elapsed_ms:.1f} ms")
+        if elapsed_ms > target_ms:
+            break
+        best = rounds
+    return best
+
+
+# Run the calibration when the script is executed: python -m utils.passwords [target_ms]
+if __name__ == "__main__":
+    target = float(sys.argv[1]) if len(sys.argv) > 1 else 250.0
+    rounds = calibrate_rounds(target)
+    print(f"Set BCRYPT_ROUNDS={rounds} for verify times within {target:.0f} ms.")
@@ -0,0 +1,144 @@
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Opt-in per-request SQL profiling
+SQL_PROFILING = os.getenv("SQL_PROFILING", "0") == "1"
+# Requests slower than this, or repeating one statement this often, are logged
+SLOW_REQUEST_MS = float(os.getenv("SQL_PROFILING_SLOW_MS", 200))
+REPEATED_STATEMENT_THRESHOLD = int(os.getenv("SQL_PROFILING_REPEAT_THRESHOLD", 5))
+
+_current_stats = ContextVar("sql_query_stats", default=None)
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Reduce a statement to its shape so the same query with different
+    parameters counts as a repeat.
+    """
+    shape = re.sub(r"\s+", " ", statement).strip()
+    shape = re.sub(r"\b\d+(\.\d+)?\b", "?", shape)
+    return re.sub(r"\(\s*\?(\s*,\s*\?)*\s*\)", "(?)", shape)
+
+
+class QueryStats:
+    """Queries issued while handling one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.total_seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated_statements(self, threshold: int = REPEATED_STATEMENT_THRESHOLD) -> dict:
+        """Statement shapes issued at least `threshold` times, a sign of N+1 queries."""
+        return {shape: count for shape, count in self.shapes.items() if count >= threshold}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_times"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start
+    # time so stale entries do not pile up on the pooled connection
+    if context.connection is not None and context.connection.info.get("query_start_times"):
+        context.connection.info["query_start_times"].pop()
+
+
+def install_query_hooks(bind: Engine):
+    """
+    Time every statement on the engine and attribute it to the current request.
+    """
+    if not event.contains(bind, "before_cursor_execute", _before_cursor_execute):
+        event.listen(bind, "before_cursor_execute", _before_cursor_execute)
+        event.listen(bind, "after_cursor_execute", _after_cursor_execute)
+        event.listen(bind, "handle_error", _handle_error)
+
+
+class SQLProfilingMiddleware:
+    """
+    Collects the queries behind each HTTP request, reports them in a
+    Server-Timing header and logs slow requests and repeated statements.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - started) * 1000
+                server_timing = (
+                    f'db;dur={stats.total_seconds * 1000:.1f};desc="{stats.count} queries", '
+                    f"app;dur={total_ms:.1f}"
+                )
+                message.setdefault("headers", []).append((b"server-timing", server_timing.encode("latin-1")))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            self._log(scope, stats, (time.perf_counter() - started) * 1000)
+
+    @staticmethod
+    def _log(scope, stats: QueryStats, total_ms: float):
+        repeated = stats.repeated_statements()
+        if total_ms < SLOW_REQUEST_MS and not repeated:
+            return
+        print(
+            f"[sql] {scope['method']} {scope['path']}: {total_ms:.1f} ms, "
+            f"{stats.count} queries, {stats.total_seconds * 1000:.1f} ms in the database"
+        )
+        for shape, count in repeated.items():
+            print(f"[sql]   repeated {count}x: {shape}")
+
+
+@contextmanager
+def assert_max_queries(limit: int, bind: Engine):
+    """
+    Fail if more than `limit` statements run on the engine inside the block,
+    from any thread. For checking endpoints against a query budget:
+
+        with assert_max_queries(5, engine):
+            client.get("/reports/by-user", headers=headers)
+    """
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(bind, "after_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(bind, "after_cursor_execute", capture)
+
+    if len(statements) > limit:
+        listing = "\n".join(f"  {statement_shape(statement)}" for statement in statements)
+        raise AssertionError(f"Expected at most {limit} queries, got {len(statements)}:\n{listing}")
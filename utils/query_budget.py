@@ -0,0 +1,91 @@
+import os
+import sys
+import tempfile
+
+# Rows seeded per table; an endpoint issuing one query per row blows its budget
+SEED_ROWS = 20
+
+# Most statements each endpoint may issue, however many rows it returns
+ENDPOINT_BUDGETS = {
+    "reports_by_user": ("GET", "/reports/by-user", 4),
+    "reports_by_quiz": ("GET", "/reports/by-quiz/{quiz_id}", 4),
+    "all_users": ("GET", "/users/", 4),
+    "current_user": ("GET", "/users/me", 4),
+    "progress": ("GET", "/users/me/progress", 3),
+    "leaderboard": ("GET", "/quizzes/{quiz_id}/leaderboard", 2),
+    "submit_answer": ("POST", "/quizzes/{quiz_id}/submit-answer", 10),
+}
+
+
+def seed(db) -> dict:
+    """
+    Fill a fresh database with an admin, SEED_ROWS users and a quiz with
+    SEED_ROWS completed reports. Returns the request parameters to check with.
+    """
+    from models import User, Quiz, Report
+    from utils.utils import create_access_token
+
+    admin = db.query(User).filter(User.is_admin == 1).first()
+    for index in range(SEED_ROWS):
+        db.add(User(username=f"budget-user-{index}", password="!"))
+    db.commit()
+
+    questions = {f"question {index}": f"answer {index}" for index in range(SEED_ROWS + 1)}
+    quiz = Quiz.create_quiz(db, "budget quiz", questions, admin.id)
+    for _ in range(SEED_ROWS):
+        report = Report.create_report(db, admin.id, quiz.id)
+        report.mark_completed(db, 50.0)
+
+    # An open session to answer into
+    report = Report.create_report(db, admin.id, quiz.id)
+    question = next(iter(questions))
+    report.asked_questions.append(question)
+    db.commit()
+
+    return {
+        "quiz_id": quiz.id,
+        "headers": {"Authorization": f"Bearer {create_access_token(data={'sub': admin.username})}"},
+        "submit_answer": {"report_id": report.id, "question": question, "user_answer": "wrong"},
+    }
+
+
+def find_over_budget() -> dict:
+    """
+    Request every budgeted endpoint against seeded data and collect the ones
+    that issue more statements than allowed. Returns a mapping of endpoint name
+    to the assertion message for each offender.
+    """
+    from fastapi.testclient import TestClient
+    from database import SessionLocal, engine
+    from main import app
+    from utils.profiling import assert_max_queries
+
+    with SessionLocal() as db:
+        params = seed(db)
+
+    failures = {}
+    client = TestClient(app)
+    for name, (method, path, limit) in ENDPOINT_BUDGETS.items():
+        url = path.format(quiz_id=params["quiz_id"])
+        try:
+            with assert_max_queries(limit, engine):
+                response = client.request(method, url, headers=params["headers"], params=params.get(name))
+        except AssertionError as e:
+            failures[name] = str(e)
+            continue
+        if response.status_code >= 400:
+            failures[name] = f"{method} {url} returned {response.status_code}: {response.text}"
+    return failures
+
+
+# Run the check when the script is executed: python -m utils.query_budget
+if __name__ == "__main__":
+    # Point the app at a throwaway database before anything imports it
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'query_budget.db')}"
+
+    failures = find_over_budget()
+    for name, message in failures.items():
+        print(f"{name}: {message}")
+    if failures:
+        sys.exit(1)
+    print(f"All {len(ENDPOINT_BUDGETS)} endpoints stay within their query budget.")
@@ -0,0 +1,73 @@
+import sys
+from sqlalchemy import create_engine, func, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from models import Quiz, Report, LeaderboardEntry, UserQuizProgress
+from utils.migrations import run_migrations
+
+# The queries that run on every request or login and must stay on an index
+HOT_QUERIES = {
+    "reports_by_user": lambda db: db.query(Report).filter(Report.user_id == 1),
+    "reports_by_quiz": lambda db: db.query(Report).filter(Report.quiz_id == 1),
+    "report_count_by_user": lambda db: db.query(func.count(Report.id)).filter(Report.user_id == 1),
+    "quiz_count_by_creator": lambda db: db.query(func.count(Quiz.id)).filter(Quiz.created_by == 1),
+    "quizzes_by_creator": lambda db: db.query(Quiz).filter(Quiz.created_by == 1),
+    "leaderboard_top": lambda db: (
+        db.query(LeaderboardEntry)
+        .filter(LeaderboardEntry.quiz_id == 1)
+        .order_by(LeaderboardEntry.best_score.desc(), LeaderboardEntry.best_duration.asc())
+        .limit(10)
+    ),
+    "progress_by_user": lambda db: db.query(UserQuizProgress).filter(UserQuizProgress.user_id == 1),
+    "quizzes_by_questions": lambda db: db.query(Quiz.id).filter(Quiz.questions_hash == "0" * 64),
+}
+
+
+def explain(db: Session, query) -> list:
+    """
+    Return the `EXPLAIN QUERY PLAN` detail lines for an ORM query.
+    """
+    statement = query.statement.compile(
+        dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}
+    )
+    rows = db.execute(text(f"EXPLAIN QUERY PLAN {statement}")).fetchall()
+    return [row[-1] for row in rows]
+
+
+def find_table_scans(bind: Engine) -> dict:
+    """
+    Run every hot query through the planner and collect the ones that scan a table.
+    Returns a mapping of query name to its plan for each offending query.
+    """
+    failures = {}
+    with Session(bind=bind) as db:
+        for name, build_query in HOT_QUERIES.items():
+            plan = explain(db, build_query(db))
+            if any(detail.startswith("SCAN") for detail in plan):
+                failures[name] = plan
+    return failures
+
+
+def check_query_plans(bind: Engine = None):
+    """
+    Fail if any hot query falls back to a table scan.
+    Defaults to a fresh in-memory database built by the migrations.
+    """
+    if bind is None:
+        bind = create_engine("sqlite://")
+        run_migrations(bind)
+
+    failures = find_table_scans(bind)
+    if failures:
+        details = "\n".join(f"  {name}: {'; '.join(plan)}" for name, plan in failures.items())
+        raise AssertionError(f"Hot queries are scanning tables:\n{details}")
+
+
+# Run the check when the script is executed
+if __name__ == "__main__":
+    try:
+        check_query_plans()
+    except AssertionError as e:
+        print(e)
+        sys.exit(1)
+    print(f"All {len(HOT_QUERIES)} hot queries use an index.")
@@ -0,0 +1,210 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+
+class RateLimit:
+    """A token bucket: `burst` requests at once, refilled at `per_minute` requests per minute."""
+
+    def __init__(self, per_minute: float, burst: int):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+
+    def refill(self, tokens: float, elapsed: float) -> float:
+        """Tokens in a bucket after `elapsed` seconds of refilling."""
+        return min(self.burst, tokens + elapsed * self.rate)
+
+
+class InMemoryBackend:
+    """
+    Keeps buckets in this process. Each worker process enforces its own limits.
+    """
+
+    MAX_BUCKETS = 10000  # Prune full buckets once this many keys are tracked
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def take(self, key: str, limit: RateLimit, now: float) -> float:
+        """
+        Take one token from the bucket. Returns 0 if the request is allowed,
+        otherwise the number of seconds until a token becomes available.
+        """
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (limit.burst, now, limit))
+            tokens = limit.refill(tokens, now - updated)
+            retry_after = 0.0 if tokens >= 1 else (1 - tokens) / limit.rate
+            if not retry_after:
+                tokens -= 1
+            self._buckets[key] = (tokens, now, limit)
+            if len(self._buckets) > self.MAX_BUCKETS:
+                self._prune(now)
+            return retry_after
+
+    def _prune(self, now: float):
+        """Drop buckets that have refilled completely under their own limit, they carry no state."""
+        self._buckets = {
+            key: (tokens, updated, limit)
+            for key, (tokens, updated, limit) in self._buckets.items()
+            if limit.refill(tokens, now - updated) < limit.burst
+        }
+
+
+class SQLiteBackend:
+    """
+    Keeps buckets in a SQLite file so every worker process on the host shares them.
+    """
+
+    PRUNE_INTERVAL = 60  # Seconds between deletes of buckets that have refilled
+
+    def __init__(self, path: str):
+        self.path = path
+        self._next_prune = 0.0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, full_at REAL)"
+            )
+            # Files created before full_at was tracked
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(rate_limit_buckets)")}
+            if "full_at" not in columns:
+                conn.execute("ALTER TABLE rate_limit_buckets ADD COLUMN full_at REAL")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_rate_limit_buckets_full_at ON rate_limit_buckets (full_at)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+
+    def take(self, key: str, limit: RateLimit, now: float) -> float:
+        """
+        Take one token from the bucket. Returns 0 if the request is allowed,
+        otherwise the number of seconds until a token becomes available.
+        """
+        conn = self._connect()
+        try:
+            # Lock the database for the read-modify-write
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated = row if row else (limit.burst, now)
+            tokens = limit.refill(tokens, now - updated)
+            retry_after = 0.0 if tokens >= 1 else (1 - tokens) / limit.rate
+            if not retry_after:
+                tokens -= 1
+            # When the bucket will be full again, so it can be pruned from then on
+            full_at = now + (limit.burst - tokens) / limit.rate
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?)",
+                (key, tokens, now, full_at),
+            )
+            if now >= self._next_prune:
+                self._next_prune = now + self.PRUNE_INTERVAL
+                conn.execute("DELETE FROM rate_limit_buckets WHERE full_at IS NULL OR full_at <= ?", (now,))
+            conn.execute("COMMIT")
+            return retry_after
+        finally:
+            conn.close()
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limits keyed by scope (e.g. "auth") and client or user.
+    """
+
+    def __init__(self, limits: dict, backend=None):
+        self.limits = limits
+        self.backend = backend or InMemoryBackend()
+        self.rejections = Counter()
+
+    def hit(self, scope: str, key: str) -> float:
+        """
+        Record a request. Returns 0 if it is allowed, otherwise the seconds to wait.
+        """
+        retry_after = self.backend.take(f"{scope}:{key}", self.limits[scope], time.time())
+        if retry_after:
+            self.rejections[f"{scope}:{key.split(':', 1)[0]}"] += 1
+        return retry_after
+
+
+class ConcurrencyLimiter:
+    """
+    Caps how many expensive requests run at once. A few more may wait briefly
+    for a slot; anything beyond that is rejected straight away.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self.rejections = Counter()
+
+    def acquire(self) -> bool:
+        """Take a slot, waiting up to `queue_timeout`. Returns False if rejected."""
+        if self._slots.acquire(blocking=False):
+            return True
+
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                self.rejections["queue_full"] += 1
+                return False
+            self._waiting += 1
+        try:
+            acquired = self._slots.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        if not acquired:
+            self.rejections["queue_timeout"] += 1
+        return acquired
+
+    def release(self):
+        self._slots.release()
+
+
+def create_backend():
+    """
+    Build the limiter backend from RATE_LIMIT_BACKEND: "memory" (default) or a
+    path to a SQLite file shared between worker processes.
+    """
+    backend = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    if backend == "memory":
+        return InMemoryBackend()
+    return SQLiteBackend(backend)
+
+
+# Limits for the expensive endpoints, configurable per scope
+rate_limiter = RateLimiter(
+    limits={
+        "auth": RateLimit(
+            per_minute=float(os.getenv("RATE_LIMIT_AUTH_PER_MINUTE", 10)),
+            burst=int(os.getenv("RATE_LIMIT_AUTH_BURST", 5)),
+        ),
+        "upload": RateLimit(
+            per_minute=float(os.getenv("RATE_LIMIT_UPLOAD_PER_MINUTE", 5)),
+            burst=int(os.getenv("RATE_LIMIT_UPLOAD_BURST", 2)),
+        ),
+    },
+    backend=create_backend(),
+)
+
+# Global cap on bcrypt and CSV parsing work running at the same time
+expensive_requests = ConcurrencyLimiter(
+    max_concurrent=int(os.getenv("EXPENSIVE_MAX_CONCURRENT", 4)),
+    max_queue=int(os.getenv("EXPENSIVE_MAX_QUEUE", 8)),
+    queue_timeout=float(os.getenv("EXPENSIVE_QUEUE_TIMEOUT", 2)),
+)
+
+
+def get_limiter_stats() -> dict:
+    """Rejection counters for the rate and concurrency limiters."""
+    return {
+        "rate_limited": dict(rate_limiter.rejections),
+        "concurrency_rejected": dict(expensive_requests.rejections),
+    }
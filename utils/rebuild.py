@@ -0,0 +1,74 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models import Report, LeaderboardEntry, UserQuizProgress
+
+
+def rebuild_leaderboards(db: Session) -> int:
+    """
+    Rebuild every quiz leaderboard from completed reports.
+    Returns the number of reports replayed.
+    """
+    db.query(LeaderboardEntry).delete()
+    db.flush()
+
+    replayed = 0
+    completed = (
+        db.query(Report)
+        .filter(
+            Report.completed_on.isnot(None),
+            Report.score.isnot(None),
+            Report.sample_size.is_(None),  # Sampled sessions are not ranked
+        )
+        .order_by(Report.completed_on, Report.id)  # Ties go to the earlier completion, as live
+    )
+    for report in completed:
+        LeaderboardEntry.record(
+            db, report.quiz_id, report.user_id, report.score, report.duration_seconds(), report.completed_on
+        )
+        db.flush()
+        replayed += 1
+    db.commit()
+    return replayed
+
+
+def rebuild_progress(db: Session) -> int:
+    """
+    Rebuild every user's per-quiz progress summary from their reports.
+    Completions are replayed in the order they happened, so the last score
+    and mastery match what live maintenance would have produced.
+    Returns the number of reports replayed.
+    """
+    db.query(UserQuizProgress).delete()
+    db.flush()
+
+    replayed = 0
+    attempts = (
+        db.query(Report.user_id, Report.quiz_id, func.count(Report.id))
+        .group_by(Report.user_id, Report.quiz_id)
+    )
+    for user_id, quiz_id, count in attempts:
+        db.add(UserQuizProgress(user_id=user_id, quiz_id=quiz_id, attempts=count, completions=0))
+        replayed += count
+    db.flush()
+
+    completed = (
+        db.query(Report)
+        .filter(Report.completed_on.isnot(None), Report.score.isnot(None))
+        .order_by(Report.completed_on, Report.id)
+    )
+    for report in completed:
+        UserQuizProgress.record_completion(
+            db, report.user_id, report.quiz_id, report.score, report.completed_on
+        )
+    db.commit()
+    return replayed
+
+
+# Run the rebuild when the script is executed
+if __name__ == "__main__":
+    with SessionLocal() as session:
+        total = rebuild_leaderboards(session)
+        print(f"Leaderboards rebuilt from {total} completed reports.")
+        total = rebuild_progress(session)
+        print(f"Progress summaries rebuilt from {total} reports.")
@@ -0,0 +1,139 @@
+import re
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+# Name matches rank above matches in question and answer text
+NAME_WEIGHT = 10.0
+CONTENT_WEIGHT = 1.0
+
+# Words shown around the first match in a result snippet
+SNIPPET_WORDS = 12
+
+
+def create_search_index(bind: Engine):
+    """
+    Create the FTS5 indexes: quiz names keyed by quiz ID, and question/answer
+    text keyed by the rowid of its question blob. The text index is contentless
+    and shared by every quiz with the same questions, so the text itself is only
+    ever stored once, compressed, in question_blobs.
+    """
+    with bind.begin() as conn:
+        # Older releases kept names and full text together in quiz_search
+        columns = {row[1] for row in conn.execute(text("PRAGMA table_info(quiz_search)"))}
+        if "content" in columns:
+            conn.execute(text("DROP TABLE quiz_search"))
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS quiz_search "
+            "USING fts5(name, tokenize='unicode61 remove_diacritics 2')"
+        ))
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS question_search "
+            "USING fts5(content, content='', tokenize='unicode61 remove_diacritics 2')"
+        ))
+
+
+def index_quiz(db: Session, quiz_id: int, name: str, questions_hash: str, questions: dict):
+    """
+    Add or replace a quiz in the search index, within the caller's transaction.
+    Question text is only indexed the first time its blob is seen.
+    """
+    db.execute(text("DELETE FROM quiz_search WHERE rowid = :id"), {"id": quiz_id})
+    db.execute(text("INSERT INTO quiz_search (rowid, name) VALUES (:id, :name)"), {"id": quiz_id, "name": name})
+
+    blob_rowid = db.execute(
+        text("SELECT rowid FROM question_blobs WHERE hash = :hash"), {"hash": questions_hash}
+    ).scalar()
+    indexed = db.execute(
+        text("SELECT 1 FROM question_search WHERE rowid = :id"), {"id": blob_rowid}
+    ).scalar()
+    if not indexed:
+        db.execute(
+            text("INSERT INTO question_search (rowid, content) VALUES (:id, :content)"),
+            {"id": blob_rowid, "content": "\n".join(f"{question} {answer}" for question, answer in questions.items())},
+        )
+
+
+def build_match_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 query that matches every word as a prefix.
+    Words are quoted so user input can never be parsed as FTS syntax.
+    """
+    words = re.findall(r"\w+", query)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def build_snippet(query: str, questions: dict) -> str:
+    """
+    The first question/answer line matching a query word, trimmed to
+    SNIPPET_WORDS words around the match with matches marked [like this].
+    The text index is contentless, so FTS5's snippet() has nothing to read.
+    """
+    prefixes = [word.lower() for word in re.findall(r"\w+", query)]
+
+    def matches(word: str) -> bool:
+        word = word.lower()
+        return any(word.startswith(prefix) for prefix in prefixes)
+
+    for question, answer in questions.items():
+        words = f"{question} {answer}".split()
+        hits = [index for index, word in enumerate(words) if matches(re.sub(r"\W", "", word))]
+        if not hits:
+            continue
+        start = max(0, min(hits[0] - SNIPPET_WORDS // 2, len(words) - SNIPPET_WORDS))
+        window = words[start:start + SNIPPET_WORDS]
+        marked = " ".join(f"[{word}]" if matches(re.sub(r"\W", "", word)) else word for word in window)
+        return ("..." if start else "") + marked + ("..." if start + SNIPPET_WORDS < len(words) else "")
+    return ""
+
+
+def search_quizzes(db: Session, query: str, limit: int, offset: int) -> tuple:
+    """
+    Return (total matches, page of ranked results) for a free text query.
+    A quiz matches when every word is in its name or every word is in its
+    questions and answers; matching both ranks it higher.
+    """
+    from models.question_blob import QuestionBlob
+
+    match = build_match_query(query)
+    if not match:
+        return 0, []
+
+    matches = (
+        "SELECT quiz_search.rowid AS quiz_id, bm25(quiz_search) * :name_weight AS rank "
+        "FROM quiz_search WHERE quiz_search MATCH :match "
+        "UNION ALL "
+        "SELECT q.id AS quiz_id, bm25(question_search) * :content_weight AS rank "
+        "FROM question_search "
+        "JOIN question_blobs b ON b.rowid = question_search.rowid "
+        "JOIN quizzes q ON q.questions_hash = b.hash "
+        "WHERE question_search MATCH :match"
+    )
+    params = {"match": match, "name_weight": NAME_WEIGHT, "content_weight": CONTENT_WEIGHT}
+
+    total = db.execute(
+        text(f"SELECT count(DISTINCT quiz_id) FROM ({matches})"), params
+    ).scalar()
+    rows = db.execute(
+        text(
+            "SELECT q.id, q.name, q.created_on, q.total_questions, q.questions_hash, sum(m.rank) AS rank "
+            f"FROM ({matches}) m JOIN quizzes q ON q.id = m.quiz_id "
+            "GROUP BY q.id ORDER BY rank, q.id LIMIT :limit OFFSET :offset"
+        ),
+        {**params, "limit": limit, "offset": offset},
+    ).mappings().all()
+
+    results = []
+    for row in rows:
+        questions = QuestionBlob.load_questions(
+            row["questions_hash"], lambda: db.get(QuestionBlob, row["questions_hash"])
+        )
+        results.append({
+            "id": row["id"],
+            "name": row["name"],
+            "created_on": datetime.fromisoformat(row["created_on"]) if row["created_on"] else None,
+            "total_questions": row["total_questions"],
+            "snippet": build_snippet(query, questions),
+        })
+    return total, results
@@ -1,15 +1,15 @@
 # utils.py
 
+import os
+import pandas as pd
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-
-# Password hashing configuration
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from utils.passwords import hash_password, verify_password  # noqa: F401  Shared hashing service
 
 SECRET_KEY = "your_secret_key"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 30))
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
@@ -27,14 +27,11 @@ def verify_token(token: str):
     except JWTError:
         raise ValueError("Invalid token")
     
-def hash_password(password: str) -> str:
-    """
-    Hash a plaintext password.
-    """
-    return pwd_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def parse_quiz_csv(file) -> dict:
     """
-    Verify a plaintext password against a hashed password.
+    Read a CSV with 'Q' and 'A' columns into a question-to-answer mapping.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    df = pd.read_csv(file)
+    if "Q" not in df.columns or "A" not in df.columns:
+        raise ValueError("CSV must contain 'Q' and 'A' columns.")
+    return dict(zip(df["Q"], df["A"]))